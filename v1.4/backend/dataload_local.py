@@ -2,33 +2,57 @@ import os
 import pandas as pd
 import re
 from PyPDF2 import PdfReader
+from backend.parsers import parse_date_column
+from backend.dataloader_db import DataLoader_db
+from backend.excel_reader import read_excel_fast
+from backend.pdf_extractor import PdfTableExtractor
+from backend.validation import REJECTED_DIR, split_valid_rows, write_rejected_csv
+from data.filecache import file_cache
 
 class DataLoader_local:
     """Responsável por carregar diferentes formatos de dados em DataFrame."""
     SUPPORTED_EXTENSIONS = {'.csv', '.xls', '.xlsx', '.pdf'}
+    # Incrementar sempre que o tratamento mudar: invalida o cache de arquivos
+    LOADER_VERSION = '1.4.10'
+    # Relatórios CSV das linhas descartadas (totalizações, rodapés...)
+    REJECTED_DIR = REJECTED_DIR
 
     @staticmethod
-    def load_local(file_path: str) -> pd.DataFrame:
+    def load_local(file_path: str, sheet_name=None, header_row: int = 0) -> pd.DataFrame:
         ext = os.path.splitext(file_path)[1].lower()
         if ext not in DataLoader_local.SUPPORTED_EXTENSIONS:
             raise ValueError(f"Formato não suportado: {ext}")
 
         if ext == '.csv':
-            df = pd.read_csv(file_path, parse_dates=['DATA VENDA'])
-        elif ext in ('.xls', '.xlsx'):
-            df = pd.read_excel(file_path, parse_dates=['DATA VENDA'])
+            df = pd.read_csv(file_path, dtype=DataLoader_db.SCHEMA.read_dtypes())
+        elif ext == '.xls':
+            df = pd.read_excel(file_path, sheet_name=sheet_name or 0, header=header_row,
+                               dtype=DataLoader_db.SCHEMA.read_dtypes())
+        elif ext == '.xlsx':
+            df = read_excel_fast(file_path, sheet_name=sheet_name, header_row=header_row,
+                                 dtype=DataLoader_db.SCHEMA.read_dtypes())
         else:
-            reader = PdfReader(file_path)
-            text = "\n".join(page.extract_text() or '' for page in reader.pages)
-            df = pd.DataFrame({'Texto': [text]})
-            return df
+            df = PdfTableExtractor(DataLoader_db.COLUMN_MAPPING).extract(file_path)
+            if df.empty:
+                # Sem tabela reconhecida: mantém o texto bruto para visualização
+                reader = PdfReader(file_path)
+                text = "\n".join(page.extract_text() or '' for page in reader.pages)
+                return pd.DataFrame({'Texto': [text]})
 
+        if 'DATA VENDA' in df.columns:
+            df['DATA VENDA'] = parse_date_column(df['DATA VENDA'], dayfirst=True)
+
+        rejected_report = None
         if 'VENDEDOR' in df.columns:
-            df = df[df['VENDEDOR'].apply(lambda x: isinstance(x, str) and x.strip() != "")]
-            invalid_keywords = ["ENCERRAMENTO", "TOTAL", "DESCONTOS", "R\$"]
-            keyword_pattern = '|'.join(invalid_keywords)
-            regex_numeric = r'^\s*\d+[\d.,]*\s*$'
-            df = df[~df['VENDEDOR'].str.upper().str.contains(keyword_pattern, regex=True)]
-            df = df[~df['VENDEDOR'].str.match(regex_numeric)]
+            df, rejected = split_valid_rows(df, 'VENDEDOR')
+            if not rejected.empty:
+                path = write_rejected_csv(rejected, file_path, DataLoader_local.REJECTED_DIR,
+                                          file_cache.file_hash(file_path))
+                print(f"DEBUG: {len(rejected)} linha(s) rejeitada(s), relatório em {path}")
+                rejected_report = (len(rejected), path)
 
+        df = DataLoader_db.SCHEMA.apply(df, raw_headers=True)
+        if rejected_report:
+            # (quantidade, caminho do CSV) para o aviso na interface
+            df.attrs['rejected_report'] = rejected_report
         return df
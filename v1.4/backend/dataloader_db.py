@@ -1,11 +1,21 @@
 import os
+import queue
+import threading
+from typing import Iterator
 import pandas as pd
-from PyPDF2 import PdfReader
 from datetime import datetime
+from backend.parsers import parse_br_numeric, parse_date_column
+from backend.schema import VendasSchema
+from backend.excel_reader import iter_excel_chunks, read_excel_fast
+from backend.pdf_extractor import PdfTableExtractor
+from backend.validation import MOTIVO_VALOR, REJECTED_DIR, write_rejected_csv
 
 class DataLoader_db:
     """Responsável por carregar e tratar diferentes formatos de dados em DataFrame."""
     SUPPORTED_EXTENSIONS = {'.csv', '.xls', '.xlsx', '.pdf'}
+    CHUNK_SIZE = 50_000
+    # Incrementar sempre que o tratamento mudar: invalida o cache de arquivos
+    LOADER_VERSION = '1.4.10'
     
     COLUMN_MAPPING = {
         'DATA VENDA': 'data_venda',
@@ -32,64 +42,186 @@ class DataLoader_db:
     }
 
     @staticmethod
-    def load_db(file_path: str) -> pd.DataFrame:
+    def load_db(file_path: str, sheet_name=None, header_row: int = 0) -> pd.DataFrame:
         ext = os.path.splitext(file_path)[1].lower()
         if ext not in DataLoader_db.SUPPORTED_EXTENSIONS:
             raise ValueError(f"Formato não suportado: {ext}")
 
         if ext == '.csv':
-            df = pd.read_csv(file_path, delimiter=';', decimal=',', dayfirst=True)
-        elif ext in ('.xls', '.xlsx'):
-            df = pd.read_excel(file_path, engine='openpyxl')
+            df = pd.read_csv(file_path, delimiter=';', decimal=',', dayfirst=True,
+                             dtype=DataLoader_db.SCHEMA.read_dtypes())
+        elif ext == '.xls':
+            # formato binário antigo: openpyxl não lê, o pandas usa o xlrd
+            df = pd.read_excel(file_path, sheet_name=sheet_name or 0, header=header_row,
+                               dtype=DataLoader_db.SCHEMA.read_dtypes())
+        elif ext == '.xlsx':
+            df = read_excel_fast(file_path, sheet_name=sheet_name, header_row=header_row,
+                                 dtype=DataLoader_db.SCHEMA.read_dtypes())
         else:
             df = DataLoader_db._handle_pdf(file_path)
 
-        df = DataLoader_db._preprocess_data(df)
+        cells = []
+        df = DataLoader_db._preprocess_data(df, cells)
+        report = DataLoader_db._write_rejected_cells(cells, file_path)
+        if report:
+            # (quantidade, caminho do CSV) para o aviso na interface
+            df.attrs['rejected_report'] = report
         return df
 
     @staticmethod
-    def _preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
+    def load_db_chunks(file_path: str, chunk_size: int = CHUNK_SIZE,
+                       prefetch: int = 1, sheet_name=None,
+                       header_row: int = 0) -> Iterator[pd.DataFrame]:
+        """
+        Lê o arquivo em blocos de `chunk_size` linhas já tratados.
+
+        A leitura roda numa thread separada e fica no máximo `prefetch`
+        blocos à frente do consumidor, então enquanto um bloco é inserido
+        no banco o próximo já está sendo lido e tratado, sem que a memória
+        cresça com o tamanho do arquivo.
+        """
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext not in DataLoader_db.SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Formato não suportado: {ext}")
+
+        raw_chunks = DataLoader_db._read_chunks(file_path, ext, chunk_size,
+                                                sheet_name, header_row)
+        clean_chunks = DataLoader_db._preprocess_chunks(raw_chunks, file_path)
+        if prefetch <= 0:
+            return clean_chunks
+        return DataLoader_db._prefetch(clean_chunks, prefetch)
+
+    @staticmethod
+    def _preprocess_chunks(raw_chunks: Iterator[pd.DataFrame],
+                           file_path: str) -> Iterator[pd.DataFrame]:
+        """Trata cada bloco; as células rejeitadas de todos vão para um relatório só, no fim."""
+        cells = []
+        offset = 0
+        for chunk in raw_chunks:
+            # Linhas numeradas pela posição no arquivo, não no bloco
+            chunk = chunk.set_axis(pd.RangeIndex(offset, offset + len(chunk)))
+            offset += len(chunk)
+            yield DataLoader_db._preprocess_data(chunk, cells)
+        DataLoader_db._write_rejected_cells(cells, file_path)
+
+    @staticmethod
+    def _write_rejected_cells(cells: list, file_path: str):
+        """Grava as células rejeitadas (linha, coluna, valor) em CSV; retorna (quantidade, caminho)."""
+        if not cells:
+            return None
+        from data.filecache import FileCache
+        report = pd.concat(cells).sort_index(kind='stable')
+        report['motivo'] = MOTIVO_VALOR
+        path = write_rejected_csv(report, file_path, REJECTED_DIR, FileCache.file_hash(file_path),
+                                  kind='celulas_rejeitadas')
+        print(f"DEBUG: {len(report)} célula(s) rejeitada(s), relatório em {path}")
+        return len(report), path
+
+    @staticmethod
+    def _read_chunks(file_path: str, ext: str, chunk_size: int,
+                     sheet_name=None, header_row: int = 0) -> Iterator[pd.DataFrame]:
+        if ext == '.csv':
+            with pd.read_csv(file_path, delimiter=';', decimal=',', dayfirst=True,
+                             dtype=DataLoader_db.SCHEMA.read_dtypes(),
+                             chunksize=chunk_size) as reader:
+                yield from reader
+        elif ext == '.xls':
+            df = pd.read_excel(file_path, sheet_name=sheet_name or 0, header=header_row,
+                               dtype=DataLoader_db.SCHEMA.read_dtypes())
+            for start in range(0, len(df), chunk_size):
+                yield df.iloc[start:start + chunk_size]
+        elif ext == '.xlsx':
+            yield from iter_excel_chunks(file_path, chunk_size=chunk_size,
+                                         sheet_name=sheet_name, header_row=header_row,
+                                         dtype=DataLoader_db.SCHEMA.read_dtypes())
+        else:
+            yield DataLoader_db._handle_pdf(file_path)
+
+    @staticmethod
+    def _prefetch(chunks: Iterator[pd.DataFrame], depth: int) -> Iterator[pd.DataFrame]:
+        """Consome `chunks` numa thread produtora com fila limitada a `depth`."""
+        q = queue.Queue(maxsize=depth)
+        done = object()
+        stop = threading.Event()
+
+        def producer():
+            try:
+                for chunk in chunks:
+                    if stop.is_set():
+                        return
+                    q.put(chunk)
+                q.put(done)
+            except BaseException as e:
+                q.put(e)
+
+        t = threading.Thread(target=producer, daemon=True)
+        t.start()
+        try:
+            while True:
+                item = q.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Libera a produtora caso o consumidor pare no meio (ex.: rollback)
+            stop.set()
+            while t.is_alive():
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    t.join(0.05)
+
+    @staticmethod
+    def _preprocess_data(df: pd.DataFrame, rejected_cells: list = None) -> pd.DataFrame:
+        """
+        Renomeia, converte datas e números e aplica o esquema. As células
+        numéricas inválidas entram em `rejected_cells` (um DataFrame
+        coluna/valor por coluna, indexado pela linha); em `df.attrs` fica só
+        a contagem por coluna, que o pandas copia a cada operação.
+        """
         df = df.rename(columns=DataLoader_db.COLUMN_MAPPING)
         
         date_columns = ['data_venda', 'data_alocacao']
         for col in date_columns:
             if col in df.columns:
-                df[col] = pd.to_datetime(
-                    df[col], 
-                    dayfirst=True, 
-                    errors='coerce'
-                ).dt.tz_localize(None)  # Remove timezone
-                df[col] = df[col].where(df[col].notna(), None)
+                df[col] = parse_date_column(df[col], dayfirst=True)
 
         numeric_cols = [
             'comissao_percentual', 'base_calc_comissao', 'comissao_reais',
             'estorno_reais', 'cancelamento_cota_reais', 'base_reais', 'liquido_reais'
         ]
         
+        rejected = {}
         for col in numeric_cols:
             if col in df.columns:
-                df[col] = (
-                    df[col]
-                    .astype(str)
-                    .str.replace(r'[^\d,]', '', regex=True)
-                    .str.replace(',', '.')
-                    .replace('', None)
-                    .astype(float)
-                )
+                df[col], bad = parse_br_numeric(df[col])
+                if not bad.empty:
+                    rejected[col] = len(bad)
+                    if rejected_cells is not None:
+                        rejected_cells.append(pd.DataFrame({'coluna': col, 'valor': bad}))
+                    print(f"DEBUG: {len(bad)} célula(s) rejeitada(s) em '{col}'")
         
-        df = df.replace({
-            'NULL': None,
-            'null': None,
-            '': None,
-            'nan': None,
-            'NaN': None,
+        null_values = ['NULL', 'null', '', 'nan', 'NaN']
+        VendasSchema.drop_null_tokens(df, null_values)
+        text_cols = df.select_dtypes(include='object').columns
+        df[text_cols] = df[text_cols].replace({
+            **{v: None for v in null_values},
             pd.NaT: None
         })
+        df = DataLoader_db.SCHEMA.apply(df)
+        # Células numéricas que não puderam ser convertidas: {coluna: quantidade}
+        df.attrs['rejected_numeric'] = rejected
         
         return df
 
     @staticmethod
     def _handle_pdf(file_path: str) -> pd.DataFrame:
-        reader = PdfReader(file_path)
-        text = "\n".join(page.extract_text() or '' for page in reader.pages)
-        return pd.DataFrame({'Texto': [text]})
\ No newline at end of file
+        df = PdfTableExtractor(DataLoader_db.COLUMN_MAPPING).extract(file_path)
+        if df.empty:
+            raise ValueError("Nenhuma tabela de vendas encontrada no PDF")
+        return df
+
+
+DataLoader_db.SCHEMA = VendasSchema(DataLoader_db.COLUMN_MAPPING)
\ No newline at end of file
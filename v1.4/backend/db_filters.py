@@ -1,52 +1,82 @@
 from decimal import Decimal
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from typing import Union
-from sqlalchemy import select, func, extract, and_
+from typing import Iterable, Optional, Union
+from sqlalchemy import select, func, and_, tuple_
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from data.db import Session, vendas
+from data.db import (Session, dim_consorciado, dim_vendedor, resumo_lote, resumo_mensal,
+                     vendas, vendas_fato, year_range)
+from data.querycache import cached_query
+from data.streaming import read_frame
 
+BatchIds = Optional[Union[str, Iterable[str]]]
 
 
-def filter_status_atraso_db(df: pd.DataFrame) -> pd.DataFrame:
-    """Retorna apenas vendas com status 'Em atraso'."""
+def _batch_list(batch_ids: BatchIds) -> list:
+    """Normaliza um batch_id ou uma lista deles (None/vazio = todos os lotes)."""
+    if batch_ids is None:
+        return []
+    if isinstance(batch_ids, str):
+        return [batch_ids]
+    return [b for b in batch_ids if b]
+
+
+def _scoped(stmt, column, batch_ids: list):
+    """Restringe a consulta aos lotes (WHERE batch_id IN (...)), se houver."""
+    return stmt.where(column.in_(batch_ids)) if batch_ids else stmt
+
+
+def _totals_source(batch_ids: list):
+    """Resumo por lote quando há lotes selecionados; senão o resumo mensal."""
+    return resumo_lote if batch_ids else resumo_mensal
+
+
+@cached_query
+def filter_status_atraso_db(df: pd.DataFrame, batch_ids: BatchIds = None) -> pd.DataFrame:
+    """
+    Retorna apenas vendas com status 'Em atraso'.
+    Com `batch_ids`, a consulta roda no banco só sobre esses lotes.
+    """
     print("DEBUG: Calling filter_status_atraso_db()")
-    if not df.empty:
+    batch_ids = _batch_list(batch_ids)
+    if not df.empty and not batch_ids:
         print(df)
         return df[df['status_cota'] != 'A']
     else:
-        with Session() as session:
-            stmt = select(vendas).where(vendas.c.status_cota != 'A')
-            print(f"DEBUG: Executing SQL: {stmt}")
-            records = session.execute(stmt).mappings().all()
-            print(f"DEBUG: Retrieved {len(records)} rows")
-        return pd.DataFrame(records)
+        stmt = _scoped(select(vendas).where(vendas.c.status_cota != 'A'),
+                       vendas.c.batch_id, batch_ids)
+        print(f"DEBUG: Executing SQL: {stmt}")
+        return read_frame(stmt)
 
 
-def filter_by_year_db(df: pd.DataFrame, year: int) -> pd.DataFrame:
-    """Retorna vendas ocorridas no ano especificado."""
+@cached_query
+def filter_by_year_db(df: pd.DataFrame, year: int, batch_ids: BatchIds = None) -> pd.DataFrame:
+    """Retorna vendas ocorridas no ano especificado (só dos lotes em `batch_ids`, se houver)."""
     print(f"DEBUG: Calling filter_by_year_db(year={year})")
-    if not df.empty:
+    batch_ids = _batch_list(batch_ids)
+    if not df.empty and not batch_ids:
         return df[df['data_venda'].dt.year == year]
     else:
-        with Session() as session:
-            stmt = select(vendas).where(extract('year', vendas.c.data_venda) == year)
-            print(f"DEBUG: Executing SQL: {stmt}")
-            records = session.execute(stmt).mappings().all()
-            print(f"DEBUG: Retrieved {len(records)} rows")
-        return pd.DataFrame(records)
+        stmt = _scoped(select(vendas).where(year_range(vendas.c.data_venda, year)),
+                       vendas.c.batch_id, batch_ids)
+        print(f"DEBUG: Executing SQL: {stmt}")
+        return read_frame(stmt)
 
 
-def total_liquido_por_vendedor_db(df: pd.DataFrame) -> pd.DataFrame:
+@cached_query
+def total_liquido_por_vendedor_db(df: pd.DataFrame, batch_ids: BatchIds = None) -> pd.DataFrame:
     """
     Agrupa vendas por vendedor somando o valor líquido,
     renomeia a coluna para 'Total Líquido' e ordena do maior para o menor valor.
+    Com `batch_ids`, soma só esses lotes (a partir de resumo_lote).
     """
     print("DEBUG: Calling total_liquido_por_vendedor_db()")
-    if not df.empty:
+    batch_ids = _batch_list(batch_ids)
+    if not df.empty and not batch_ids:
         df_copy = df.copy()
 
         for col in ('vendedor', 'liquido_reais'):
@@ -64,7 +94,7 @@ def total_liquido_por_vendedor_db(df: pd.DataFrame) -> pd.DataFrame:
         # Agrupa, soma, renomeia e ordena
         result = (
             df_copy
-            .groupby('vendedor', as_index=False)['liquido_reais']
+            .groupby('vendedor', as_index=False, observed=True)['liquido_reais']
             .sum()
             .rename(columns={'liquido_reais': 'Total Líquido'})
             .sort_values(by='Total Líquido', ascending=False)
@@ -75,14 +105,21 @@ def total_liquido_por_vendedor_db(df: pd.DataFrame) -> pd.DataFrame:
 
     else:
         with Session() as session:
+            # Lê o resumo mensal ou o por lote (mantidos na ingestão): custo
+            # proporcional ao número de grupos; os nomes vêm da dimensão no fim
+            resumo = _totals_source(batch_ids)
+            totals = (
+                _scoped(select(
+                    resumo.c.vendedor_id,
+                    func.sum(resumo.c.liquido_reais).label('total_liquido')
+                ), resumo_lote.c.batch_id, batch_ids)
+                .group_by(resumo.c.vendedor_id)
+                .subquery()
+            )
             stmt = (
-                select(
-                    vendas.c.vendedor,
-                    func.sum(vendas.c.liquido_reais).label('total_liquido')
-                )
-                .where(vendas.c.vendedor != None)
-                .group_by(vendas.c.vendedor)
-                .order_by(func.sum(vendas.c.liquido_reais).desc())
+                select(dim_vendedor.c.nome, totals.c.total_liquido)
+                .join_from(totals, dim_vendedor, dim_vendedor.c.id == totals.c.vendedor_id)
+                .order_by(totals.c.total_liquido.desc())
             )
             print(f"DEBUG: Executing SQL: {stmt}")
             rows = session.execute(stmt).all()
@@ -91,21 +128,40 @@ def total_liquido_por_vendedor_db(df: pd.DataFrame) -> pd.DataFrame:
         return df
 
 
-def total_liquido_por_consorcio_vendedor_db(df: pd.DataFrame) -> pd.DataFrame:
-    """Agrupa consorciado e vendedor somando o valor líquido."""
+@cached_query
+def total_liquido_por_consorcio_vendedor_db(df: pd.DataFrame,
+                                            batch_ids: BatchIds = None) -> pd.DataFrame:
+    """Agrupa consorciado e vendedor somando o valor líquido (só dos lotes em `batch_ids`, se houver)."""
     print("DEBUG: Calling total_liquido_por_consorcio_vendedor_db()")
-    
-    if not df.empty:
-        return df.groupby(['nome_consorciado', 'vendedor'])['liquido_reais'].sum().reset_index()
+    batch_ids = _batch_list(batch_ids)
+
+    if not df.empty and not batch_ids:
+        return df.groupby(['nome_consorciado', 'vendedor'], observed=True)['liquido_reais'].sum().reset_index()
     else:
         with Session() as session:
+            # Soma por (consorciado_id, vendedor_id) no resumo; o resultado
+            # é reagrupado pelos nomes (um nome pode ter vários códigos)
+            resumo = _totals_source(batch_ids)
+            totals = (
+                _scoped(select(
+                    resumo.c.consorciado_id,
+                    resumo.c.vendedor_id,
+                    func.sum(resumo.c.liquido_reais).label('total_liquido')
+                ), resumo_lote.c.batch_id, batch_ids)
+                .group_by(resumo.c.consorciado_id, resumo.c.vendedor_id)
+                .subquery()
+            )
+            nome_consorciado = func.nullif(dim_consorciado.c.nome_consorciado, '')
             stmt = (
                 select(
-                    vendas.c.nome_consorciado,
-                    vendas.c.vendedor,
-                    func.sum(vendas.c.liquido_reais).label('total_liquido')
+                    nome_consorciado,
+                    dim_vendedor.c.nome,
+                    func.sum(totals.c.total_liquido)
                 )
-                .group_by(vendas.c.nome_consorciado, vendas.c.vendedor)
+                .select_from(totals)
+                .outerjoin(dim_consorciado, dim_consorciado.c.id == totals.c.consorciado_id)
+                .outerjoin(dim_vendedor, dim_vendedor.c.id == totals.c.vendedor_id)
+                .group_by(nome_consorciado, dim_vendedor.c.nome)
             )
             print(f"DEBUG: Executing SQL: {stmt}")
             rows = session.execute(stmt).all()
@@ -114,17 +170,19 @@ def total_liquido_por_consorcio_vendedor_db(df: pd.DataFrame) -> pd.DataFrame:
         return df
 
 
-def relatorio_por_consorciado_db(df: pd.DataFrame) -> dict:
+@cached_query
+def relatorio_por_consorciado_db(df: pd.DataFrame, batch_ids: BatchIds = None) -> dict:
     """
     Gera relatório por consorciado com data da primeira venda,
     vendedores (soma líquida *1.2) e total geral.
     """
     report = {}
-    if not df.empty: 
-        grouped = df.groupby('nome_consorciado')
+    batch_ids = _batch_list(batch_ids)
+    if not df.empty and not batch_ids: 
+        grouped = df.groupby('nome_consorciado', observed=True)
         for consorciado, group in grouped:
             data_venda = group['data_venda'].iloc[0]
-            vendedores = group.groupby('vendedor')['liquido_reais'].sum().reset_index()
+            vendedores = group.groupby('vendedor', observed=True)['liquido_reais'].sum().reset_index()
             vendedores['Total'] = float(vendedores['liquido_reais']) * 1.2  # adiciona 20%
             total_consorciado = vendedores['Total'].sum()
             report[consorciado] = {
@@ -135,38 +193,212 @@ def relatorio_por_consorciado_db(df: pd.DataFrame) -> dict:
             print(df.columns)
         return report
     else:
+        # Uma consulta só: a janela pega a data_venda da primeira linha de
+        # cada consorciado e o GROUP BY soma por consorciado × vendedor
+        linhas = _linhas_primeira_venda(batch_ids)
+        stmt = (
+            select(
+                linhas.c.nome_consorciado,
+                linhas.c.data_venda,
+                dim_vendedor.c.nome.label('vendedor'),
+                func.sum(linhas.c.liquido_reais).label('liquido_reais')
+            )
+            .select_from(linhas)
+            .outerjoin(dim_vendedor, dim_vendedor.c.id == linhas.c.vendedor_id)
+            .group_by(linhas.c.nome_consorciado, linhas.c.data_venda,
+                      linhas.c.vendedor_id, dim_vendedor.c.nome)
+            .order_by(linhas.c.nome_consorciado)
+        )
+        print(f"DEBUG: Executing SQL: {stmt}")
         with Session() as session:
-            consorciados = session.execute(
-                select(vendas.c.nome_consorciado).distinct()
-            ).scalars().all()
-            print(f"DEBUG: Found {len(consorciados)} consorciados")
-            for nome in consorciados:
-                print(f"DEBUG: Processing consorciado={nome}")
-                rows = session.execute(
-                    select(
-                        vendas.c.data_venda,
-                        vendas.c.vendedor,
-                        vendas.c.liquido_reais
-                    ).where(vendas.c.nome_consorciado == nome)
-                ).all()
-                if not rows:
-                    print(f"DEBUG: No vendas for {nome}")
-                    continue
-                data_venda = rows[0].data_venda
-                agg = {}
-                for r in rows:
-                    agg[r.vendedor] = agg.get(r.vendedor, 0) + r.liquido_reais
-                vendedores = {v: total * Decimal("1.2") for v, total in agg.items()}
-                total_geral = sum(vendedores.values())
-                report[nome] = {
-                    'data_venda': data_venda,
-                    'vendedores': vendedores,
-                    'total': total_geral
-                }
-                print(f"DEBUG: Report for {nome} -> total={total_geral}")
+            rows = session.execute(stmt).all()
+        report = _build_relatorio(rows)
+        print(f"DEBUG: Report with {len(report)} consorciados ({len(rows)} rows)")
         return report
 
 
+def _linhas_primeira_venda(batch_ids: list):
+    """
+    Subconsulta com uma linha por venda de consorciado com nome: nome, vendedor_id,
+    liquido_reais e a data_venda da primeira linha (menor id) do consorciado.
+    """
+    f = vendas_fato
+    nome = func.nullif(dim_consorciado.c.nome_consorciado, '')
+    stmt = (
+        select(
+            nome.label('nome_consorciado'),
+            f.c.vendedor_id,
+            f.c.liquido_reais,
+            func.first_value(f.c.data_venda, type_=f.c.data_venda.type)
+            .over(partition_by=nome, order_by=f.c.id)
+            .label('data_venda')
+        )
+        .select_from(f)
+        .outerjoin(dim_consorciado, dim_consorciado.c.id == f.c.consorciado_id)
+        .where(nome != None)
+    )
+    return _scoped(stmt, f.c.batch_id, batch_ids).subquery()
+
+
+def _build_relatorio(rows) -> dict:
+    """Relatório a partir de (nome_consorciado, data_venda, vendedor, liquido_reais) agregados."""
+    report = {}
+    for nome, data_venda, vendedor, liquido in rows:
+        entry = report.setdefault(nome, {
+            'data_venda': data_venda,
+            'vendedores': {},
+            'total': 0
+        })
+        liquido = liquido or 0
+        total = liquido * (Decimal("1.2") if isinstance(liquido, Decimal) else 1.2)
+        entry['vendedores'][vendedor] = total
+        entry['total'] += total
+    return report
+
+
+def _is_named(values: pd.Series) -> pd.Series:
+    """Vendedor válido: texto não vazio (mesmo critério de total_liquido_por_vendedor_db)."""
+    return values.map(lambda x: isinstance(x, str) and x.strip() != "").astype(bool)
+
+
+def _snapshot_from_grain(grain: pd.DataFrame, firsts: pd.DataFrame,
+                         por_vendedor: pd.DataFrame = None) -> dict:
+    """
+    Os três resultados a partir das somas por consorciado × vendedor
+    (`grain`: nome_consorciado, vendedor, liquido_reais) e da data da
+    primeira venda de cada consorciado (`firsts`: nome_consorciado, data_venda).
+    `por_vendedor` (vendedor, liquido_reais), se já veio do banco, é usado direto.
+    """
+    if por_vendedor is None:
+        por_vendedor = (
+            grain[_is_named(grain['vendedor'])]
+            .groupby('vendedor', as_index=False, sort=False, observed=True)['liquido_reais'].sum()
+        )
+    else:
+        por_vendedor = por_vendedor[_is_named(por_vendedor['vendedor'])]
+    por_vendedor = por_vendedor.sort_values('liquido_reais', ascending=False)
+
+    relatorio = (
+        grain.dropna(subset=['nome_consorciado'])
+        .merge(firsts, on='nome_consorciado', how='left')
+        [['nome_consorciado', 'data_venda', 'vendedor', 'liquido_reais']]
+    )
+    return {
+        'por_vendedor': pd.DataFrame(por_vendedor[['vendedor', 'liquido_reais']].to_numpy(),
+                                     columns=['VENDEDOR', 'Total Líquido']),
+        'por_consorcio_vendedor': pd.DataFrame(
+            grain[['nome_consorciado', 'vendedor', 'liquido_reais']].to_numpy(),
+            columns=['NOME CONSORCIADO', 'VENDEDOR', 'Total Líquido']),
+        'relatorio': _build_relatorio(relatorio.itertuples(index=False, name=None)),
+    }
+
+
+def _first_sales_stmt(batch_ids: list):
+    """
+    Data da primeira venda (menor id) de cada consorciado_id: um GROUP BY
+    com min(id) e a busca dessas linhas pela chave primária. Consorciados
+    com o mesmo nome são resolvidos depois pelo menor id.
+    """
+    f = vendas_fato
+    firsts = (
+        _scoped(
+            select(f.c.consorciado_id, func.min(f.c.id).label('first_id'))
+            .where(f.c.consorciado_id != None),
+            f.c.batch_id, batch_ids
+        )
+        .group_by(f.c.consorciado_id)
+        .subquery()
+    )
+    return (
+        select(func.nullif(dim_consorciado.c.nome_consorciado, '').label('nome_consorciado'),
+               f.c.data_venda, firsts.c.first_id)
+        .select_from(firsts)
+        .join(f, f.c.id == firsts.c.first_id)
+        .join(dim_consorciado, dim_consorciado.c.id == firsts.c.consorciado_id)
+    )
+
+
+@cached_query
+def analytics_snapshot_db(df: pd.DataFrame, batch_ids: BatchIds = None) -> dict:
+    """
+    Totais por vendedor, por consorciado × vendedor e o relatório por
+    consorciado de uma vez (e guardados juntos no cache).
+
+    Os totais vêm dos resumos (resumo_lote com `batch_ids`, senão
+    resumo_mensal): no PostgreSQL numa consulta com GROUP BY GROUPING SETS
+    ((vendedor), (nome_consorciado, vendedor)); nos outros bancos agrupando
+    por consorciado × vendedor e somando por vendedor em pandas. De
+    vendas_fato só sai a data da primeira venda de cada consorciado. Com
+    `df` (sem `batch_ids`), uma passada em pandas.
+
+    Retorna {'por_vendedor', 'por_consorcio_vendedor', 'relatorio'} nos
+    mesmos formatos das funções de cada botão.
+    """
+    print("DEBUG: Calling analytics_snapshot_db()")
+    batch_ids = _batch_list(batch_ids)
+    if not df.empty and not batch_ids:
+        # Um groupby só; a posição da primeira linha de cada consorciado dá a
+        # data_venda da primeira venda
+        grain = (
+            df.assign(_pos=np.arange(len(df)),
+                      liquido_reais=pd.to_numeric(df['liquido_reais'], errors='coerce').fillna(0))
+            .groupby(['nome_consorciado', 'vendedor'], dropna=False, observed=True, sort=False)
+            .agg(liquido_reais=('liquido_reais', 'sum'), _pos=('_pos', 'min'))
+            .reset_index()
+        )
+        first_pos = grain.groupby('nome_consorciado', dropna=False, observed=True)['_pos'].min()
+        firsts = pd.DataFrame({
+            'nome_consorciado': first_pos.index,
+            'data_venda': df['data_venda'].iloc[first_pos.to_numpy()].to_numpy(),
+        })
+        return _snapshot_from_grain(grain.drop(columns='_pos'), firsts)
+
+    resumo = _totals_source(batch_ids)
+    nome = dim_consorciado.c.nome_consorciado
+    with Session() as session:
+        grouping_sets = session.get_bind().dialect.name == 'postgresql'
+        totals = _scoped(
+            select(nome, resumo.c.vendedor_id,
+                   func.sum(resumo.c.liquido_reais).label('liquido_reais'))
+            .select_from(resumo)
+            .outerjoin(dim_consorciado, dim_consorciado.c.id == resumo.c.consorciado_id),
+            resumo_lote.c.batch_id, batch_ids
+        )
+        if grouping_sets:
+            totals = totals.add_columns(func.grouping(nome).label('sem_consorciado')).group_by(
+                func.grouping_sets(tuple_(resumo.c.vendedor_id), tuple_(nome, resumo.c.vendedor_id))
+            )
+        else:
+            totals = totals.group_by(nome, resumo.c.vendedor_id)
+        totals = totals.subquery()
+        stmt = (
+            select(func.nullif(totals.c.nome_consorciado, '').label('nome_consorciado'),
+                   dim_vendedor.c.nome.label('vendedor'), totals.c.liquido_reais,
+                   *([totals.c.sem_consorciado] if grouping_sets else []))
+            .select_from(totals)
+            .outerjoin(dim_vendedor, dim_vendedor.c.id == totals.c.vendedor_id)
+        )
+        print(f"DEBUG: Executing SQL: {stmt}")
+        result = pd.DataFrame(session.execute(stmt).all(),
+                              columns=list(stmt.selected_columns.keys()))
+        firsts_stmt = _first_sales_stmt(batch_ids)
+        print(f"DEBUG: Executing SQL: {firsts_stmt}")
+        firsts = pd.DataFrame(session.execute(firsts_stmt).all(),
+                              columns=['nome_consorciado', 'data_venda', 'first_id'])
+    print(f"DEBUG: Retrieved {len(result)} totals, {len(firsts)} first sales")
+
+    # Um nome pode ter vários códigos: vale a venda de menor id
+    firsts = (firsts.sort_values('first_id')
+              .drop_duplicates('nome_consorciado')[['nome_consorciado', 'data_venda']])
+    if not grouping_sets:
+        return _snapshot_from_grain(result, firsts)
+
+    # GROUPING SETS: sem_consorciado = 1 nas linhas do total por vendedor
+    por_vendedor = result[result.sem_consorciado == 1]
+    grain = result[result.sem_consorciado == 0].drop(columns='sem_consorciado')
+    return _snapshot_from_grain(grain, firsts, por_vendedor)
+
+
 def filter_em_atraso(
     data_ref: Union[str, datetime] = "2025-03-17"
 ) -> pd.DataFrame:
@@ -175,20 +407,19 @@ def filter_em_atraso(
     """
     print(f"DEBUG: Calling filter_em_atraso(data_ref={data_ref})")
     data_ref_dt = pd.to_datetime(data_ref, dayfirst=True)
-    with Session() as session:
-        stmt = (
-            select(vendas)
-            .where(
-                and_(
-                    vendas.c.data_vencimento <= data_ref_dt,
-                    vendas.c.data_pagamento == None
-                )
+    stmt = (
+        select(vendas)
+        .where(
+            and_(
+                vendas.c.data_vencimento <= data_ref_dt,
+                vendas.c.data_pagamento == None
             )
         )
-        print(f"DEBUG: Executing SQL: {stmt}")
-        rows = session.execute(stmt).mappings().all()
-        print(f"DEBUG: Retrieved {len(rows)} rows")
-    return pd.DataFrame(rows)
+    )
+    print(f"DEBUG: Executing SQL: {stmt}")
+    df = read_frame(stmt)
+    print(f"DEBUG: Retrieved {len(df)} rows")
+    return df
 
 
 def clientes_inadimplentes(
@@ -0,0 +1,162 @@
+import os
+import sys
+import time
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Union
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+
+def _open_sheet(file_path: str, sheet_name: Optional[Union[str, int]]):
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    if sheet_name is None:
+        ws = wb.worksheets[0]
+    elif isinstance(sheet_name, int):
+        ws = wb.worksheets[sheet_name]
+    else:
+        ws = wb[sheet_name]
+    return wb, ws
+
+
+def _header_names(header: tuple) -> List[str]:
+    names, seen = [], {}
+    for i, value in enumerate(header):
+        name = str(value).strip() if value is not None else f"Unnamed: {i}"
+        # Mesmo esquema do pandas para cabeçalhos repetidos: "X", "X.1", ...
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _cell_text(value) -> str:
+    # Como na leitura do CSV (texto): 5001 e 5001.0 viram '5001'
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _text_categories(values) -> pd.Categorical:
+    """Categorias em texto; cada valor distinto é convertido uma vez e volta pelos códigos."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    texts = np.array([_cell_text(v) for v in uniques] + [None], dtype=object)
+    return pd.Categorical(texts[codes])
+
+
+def _to_frame(rows: List[tuple], names: List[str],
+              dtype: Optional[Dict[str, object]]) -> pd.DataFrame:
+    width = len(names)
+    rows = [r[:width] if len(r) >= width else r + (None,) * (width - len(r)) for r in rows]
+    # Transpõe em C (zip) e monta cada coluna de uma vez
+    columns = zip(*rows)
+    dtype = dtype or {}
+    data = {}
+    for name, values in zip(names, columns):
+        kind = dtype.get(name)
+        if kind == 'category':
+            # Categorias sempre em texto, como no CSV: células numéricas
+            # (ex.: BEM 5001) não viram categorias int/float
+            data[name] = _text_categories(values)
+        elif kind is str:
+            data[name] = pd.Series(values, dtype=object).map(_cell_text, na_action='ignore')
+        else:
+            data[name] = pd.Series(values, dtype=object).infer_objects()
+    return pd.DataFrame(data)
+
+
+def iter_excel_chunks(file_path: str, chunk_size: int = 50_000,
+                      sheet_name: Optional[Union[str, int]] = None,
+                      header_row: int = 0,
+                      dtype: Optional[Dict[str, object]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Lê uma planilha .xlsx em blocos usando openpyxl em modo read_only.
+
+    Args:
+        sheet_name: nome ou índice da aba (padrão: a primeira)
+        header_row: índice (a partir de 0) da linha de cabeçalho; as linhas
+            anteriores são ignoradas
+        dtype: tipos por coluna, no formato de `dtype=` do pandas (apenas
+            'category' e str são aplicados aqui; o resto é inferido)
+    """
+    wb, ws = _open_sheet(file_path, sheet_name)
+    try:
+        rows = ws.iter_rows(values_only=True)
+        header = next(islice(rows, header_row, None), None)
+        if header is None:
+            return
+        # Colunas sem cabeçalho no fim da planilha são descartadas
+        header = list(header)
+        while header and header[-1] is None:
+            header.pop()
+        names = _header_names(tuple(header))
+
+        block = []
+        for row in rows:
+            if row.count(None) == len(row):  # linha em branco
+                continue
+            block.append(row)
+            if len(block) == chunk_size:
+                yield _to_frame(block, names, dtype)
+                block = []
+        if block:
+            yield _to_frame(block, names, dtype)
+    finally:
+        wb.close()
+
+
+def read_excel_fast(file_path: str, sheet_name: Optional[Union[str, int]] = None,
+                    header_row: int = 0,
+                    dtype: Optional[Dict[str, object]] = None) -> pd.DataFrame:
+    """Lê a planilha inteira pelo caminho read_only de `iter_excel_chunks`."""
+    chunks = list(iter_excel_chunks(file_path, chunk_size=200_000, sheet_name=sheet_name,
+                                    header_row=header_row, dtype=dtype))
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+    df = pd.concat(chunks, ignore_index=True)
+    # concat de Categorical com categorias diferentes vira object
+    for name, kind in (dtype or {}).items():
+        if kind == 'category' and name in df.columns:
+            df[name] = df[name].astype('category')
+    return df
+
+
+if __name__ == "__main__":
+    from datetime import datetime
+    import xlsxwriter
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '_bench_vendas.xlsx')
+    print(f"=== Benchmark leitura de Excel ({n:,} linhas) ===")
+
+    # xlsxwriter grava strings compartilhadas, como o Excel faz
+    wb = xlsxwriter.Workbook(path)
+    ws = wb.add_worksheet('vendas')
+    date_fmt = wb.add_format({'num_format': 'dd/mm/yyyy'})
+    ws.write_row(0, 0, ['DATA VENDA', 'CÓD PV', 'NOME CONSORCIADO', 'STATUS COTA',
+                        'LÍQUIDO R$', 'VENDEDOR'])
+    for i in range(n):
+        ws.write_datetime(i + 1, 0, datetime(2025, 1 + i % 12, 1 + i % 28), date_fmt)
+        ws.write_row(i + 1, 1, [i % 50, f"EMPRESA {i % 300}", 'A' if i % 3 else 'D',
+                                f"{i % 9999},{i % 100:02d}", f"VENDEDOR {i % 40}"])
+    wb.close()
+
+    try:
+        t0 = time.perf_counter()
+        pd.read_excel(path, engine='openpyxl')
+        t_old = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        read_excel_fast(path, dtype={'NOME CONSORCIADO': 'category', 'VENDEDOR': 'category',
+                                     'STATUS COTA': 'category', 'CÓD PV': str})
+        t_new = time.perf_counter() - t0
+
+        print(f"pd.read_excel (openpyxl): {t_old:.2f}s  {n / t_old:,.0f} linhas/s")
+        print(f"read_excel_fast:          {t_new:.2f}s  {n / t_new:,.0f} linhas/s")
+    finally:
+        os.remove(path)
@@ -35,7 +35,7 @@ def total_liquido_por_vendedor_local(df: pd.DataFrame) -> pd.DataFrame:
     # Agrupa, soma, renomeia e ordena
     result = (
         df_copy
-        .groupby('VENDEDOR', as_index=False)['LÍQUIDO R$']
+        .groupby('VENDEDOR', as_index=False, observed=True)['LÍQUIDO R$']
         .sum()
         .rename(columns={'LÍQUIDO R$': 'Total Líquido'})
         .sort_values(by='Total Líquido', ascending=False)
@@ -47,19 +47,19 @@ def total_liquido_por_vendedor_local(df: pd.DataFrame) -> pd.DataFrame:
 
 def total_liquido_por_consorcio_vendedor_local(df: pd.DataFrame) -> pd.DataFrame:
     """Agrupa consorciado e vendedor somando o valor líquido."""
-    print(df.groupby(['NOME CONSORCIADO', 'VENDEDOR'])['LÍQUIDO R$'].sum().reset_index())
-    return df.groupby(['NOME CONSORCIADO', 'VENDEDOR'])['LÍQUIDO R$'].sum().reset_index()
+    print(df.groupby(['NOME CONSORCIADO', 'VENDEDOR'], observed=True)['LÍQUIDO R$'].sum().reset_index())
+    return df.groupby(['NOME CONSORCIADO', 'VENDEDOR'], observed=True)['LÍQUIDO R$'].sum().reset_index()
 
 def relatorio_por_consorciado_local(df: pd.DataFrame) -> dict:
     """
     Gera um dicionário com os dados agrupados por consorciado, incluindo a data de venda.
     Retorna: {consorciado: {'data_venda': data, 'vendedores': DataFrame, 'total': float}}
     """
-    grouped = df.groupby('NOME CONSORCIADO')
+    grouped = df.groupby('NOME CONSORCIADO', observed=True)
     result = {}
     for consorciado, group in grouped:
         data_venda = group['DATA VENDA'].iloc[0]
-        vendedores = group.groupby('VENDEDOR')['LÍQUIDO R$'].sum().reset_index()
+        vendedores = group.groupby('VENDEDOR', observed=True)['LÍQUIDO R$'].sum().reset_index()
         vendedores['Total'] = vendedores['LÍQUIDO R$'] * 1.2  # adiciona 20%
         total_consorciado = vendedores['Total'].sum()
         result[consorciado] = {
@@ -71,6 +71,63 @@ def relatorio_por_consorciado_local(df: pd.DataFrame) -> dict:
     return result
 
 
+def analytics_snapshot_local(df: pd.DataFrame) -> dict:
+    """
+    Total por vendedor, por consorciado e vendedor e o relatório por
+    consorciado com um groupby só (consorciado × vendedor); os outros
+    níveis saem desse resultado. Mesmos formatos das funções acima.
+
+    Só entram os agregados cujas colunas existem no arquivo: sem 'NOME
+    CONSORCIADO' (ou 'DATA VENDA', para o relatório) o resultado traz
+    apenas 'por_vendedor'.
+    """
+    for col in ('VENDEDOR', 'LÍQUIDO R$'):
+        if col not in df.columns:
+            raise KeyError(f"Coluna '{col}' não encontrada no DataFrame.")
+    por_consorciado = 'NOME CONSORCIADO' in df.columns
+    keys = ['NOME CONSORCIADO', 'VENDEDOR'] if por_consorciado else ['VENDEDOR']
+
+    data = df.assign(
+        _pos=range(len(df)),
+        **{'LÍQUIDO R$': pd.to_numeric(df['LÍQUIDO R$'], errors='coerce').fillna(0)}
+    )
+    grain = (
+        data.groupby(keys, observed=True, dropna=False)
+        .agg(**{'LÍQUIDO R$': ('LÍQUIDO R$', 'sum'), '_pos': ('_pos', 'min')})
+        .reset_index()
+    )
+
+    valid = grain['VENDEDOR'].apply(lambda x: isinstance(x, str) and x.strip() != "")
+    por_vendedor = (
+        grain.loc[valid]
+        .groupby('VENDEDOR', as_index=False, observed=True)['LÍQUIDO R$']
+        .sum()
+        .rename(columns={'LÍQUIDO R$': 'Total Líquido'})
+        .sort_values(by='Total Líquido', ascending=False)
+    )
+    snapshot = {'por_vendedor': por_vendedor}
+    if not por_consorciado:
+        return snapshot
+
+    snapshot['por_consorcio_vendedor'] = grain.dropna(subset=['NOME CONSORCIADO', 'VENDEDOR'])[
+        ['NOME CONSORCIADO', 'VENDEDOR', 'LÍQUIDO R$']].reset_index(drop=True)
+    if 'DATA VENDA' not in df.columns:
+        return snapshot
+
+    relatorio = {}
+    for consorciado, group in grain.groupby('NOME CONSORCIADO', observed=True):
+        # Primeira linha do consorciado no arquivo, como em relatorio_por_consorciado_local
+        vendedores = group.dropna(subset=['VENDEDOR'])[['VENDEDOR', 'LÍQUIDO R$']].reset_index(drop=True)
+        vendedores['Total'] = vendedores['LÍQUIDO R$'] * 1.2  # adiciona 20%
+        relatorio[consorciado] = {
+            'data_venda': df['DATA VENDA'].iloc[group['_pos'].min()],
+            'vendedores': vendedores,
+            'total': vendedores['Total'].sum()
+        }
+    snapshot['relatorio'] = relatorio
+    return snapshot
+
+
 def filter_em_atraso(
     df: pd.DataFrame,
     data_ref: Union[str, datetime] = "2025-03-17"
@@ -0,0 +1,184 @@
+import re
+import time
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Número no formato brasileiro, opcionalmente com "R$", sinal (antes ou depois
+# do símbolo, ou no fim) e parênteses contábeis: "1.234,56", "R$ -12,00",
+# "-R$ 12,00", "(12,00)", "12,00-", e percentuais ("5,00%", "10 %", que
+# viram 5.0 e 10.0). Ponto sem agrupamento de milhar ("1234.56", "1.5") é
+# tratado como separador decimal.
+BR_NUMBER_PATTERN = re.compile(
+    r'^\s*(?P<open>\()?\s*(?P<sign>[-+])?\s*(?:R\$)?\s*(?P<sign2>[-+])?\s*'
+    r'(?P<int>\d{1,3}(?:\.\d{3})+|\d+)(?:[,.](?P<frac>\d+))?(?:\s*%)?'
+    r'\s*(?P<close>\))?\s*(?P<trail>-)?\s*$',
+    re.IGNORECASE
+)
+
+# Textos que representam célula vazia e não contam como rejeitados
+NULL_TOKENS = {'', '-', 'NULL', 'NAN', 'NONE', 'NAT'}
+
+# Formatos de data testados, em ordem, contra a amostra de valores distintos
+DATE_FORMATS = [
+    '%d/%m/%Y', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%y',
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S',
+    '%d-%m-%Y', '%d.%m.%Y',
+]
+
+
+def parse_br_numeric(series: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    Converte uma coluna monetária (texto no padrão brasileiro, números ou
+    mistura dos dois) em float64.
+
+    O parse roda uma única vez sobre os valores distintos da coluna e o
+    resultado é espalhado de volta pelos códigos do factorize.
+
+    Returns:
+        (valores, rejeitados): a coluna convertida, com NaN nas células vazias
+        ou inválidas, e uma Series só com as células originais que não puderam
+        ser convertidas (índice preservado).
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('float64'), series.iloc[0:0]
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    if len(uniques) == 0:
+        return pd.Series(np.nan, index=series.index, name=series.name), series.iloc[0:0]
+    uniques = pd.Series(np.asarray(uniques, dtype=object))
+    parsed = np.full(len(uniques), np.nan)
+    rejected = np.zeros(len(uniques), dtype=bool)
+
+    is_text = uniques.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+
+    # Números que já vieram convertidos (ex.: células numéricas do Excel)
+    if (~is_text).any():
+        parsed[~is_text] = pd.to_numeric(uniques[~is_text], errors='coerce').to_numpy(dtype='float64')
+
+    if is_text.any():
+        text = uniques[is_text]
+        parts = text.str.extract(BR_NUMBER_PATTERN)
+        matched = parts['int'].notna().to_numpy()
+
+        int_part = parts['int'].str.replace('.', '', regex=False)
+        number = (int_part + '.' + parts['frac'].fillna('0')).astype('float64')
+        negative = (
+            parts['sign'].eq('-') | parts['sign2'].eq('-') | parts['trail'].eq('-')
+            | (parts['open'].notna() & parts['close'].notna())
+        )
+        number = number.where(~negative, -number)
+        parsed[is_text] = number.to_numpy(dtype='float64')
+
+        blank = text.str.strip().str.upper().isin(NULL_TOKENS).to_numpy()
+        text_rejected = ~matched & ~blank
+        rejected[np.flatnonzero(is_text)[text_rejected]] = True
+
+    values = np.where(codes >= 0, parsed[codes], np.nan)
+    rejected_mask = (codes >= 0) & rejected[codes]
+    return (
+        pd.Series(values, index=series.index, name=series.name),
+        series[rejected_mask]
+    )
+
+
+def detect_date_format(values: pd.Series, sample_size: int = 200) -> Optional[str]:
+    """Retorna o formato de DATE_FORMATS que converte a maior parte da amostra."""
+    sample = values.dropna().str.strip()
+    sample = sample[sample != ''].head(sample_size)
+    best, best_hits = None, 0
+    for fmt in DATE_FORMATS:
+        hits = pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum()
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+            if hits == len(sample):
+                break
+    return best
+
+
+def parse_date_column(series: pd.Series, dayfirst: bool = True) -> pd.Series:
+    """
+    Converte uma coluna de datas em datetime64 sem fuso horário.
+
+    Cada data distinta é convertida uma única vez: o formato é detectado numa
+    amostra dos valores distintos e o resultado volta para as linhas pelos
+    códigos do factorize. Valores fora do formato detectado caem no parse
+    genérico (`dayfirst`) e o que não for data vira NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if getattr(series.dt, 'tz', None) is not None:
+            return series.dt.tz_localize(None)
+        return series
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    if len(uniques) == 0:
+        return pd.Series(pd.NaT, index=series.index, name=series.name, dtype='datetime64[ns]')
+    uniques = pd.Series(np.asarray(uniques, dtype=object))
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype='datetime64[ns]')
+
+    is_text = uniques.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+
+    # datetime/Timestamp vindos do Excel ou já convertidos
+    if (~is_text).any():
+        others = pd.to_datetime(uniques[~is_text], errors='coerce')
+        if getattr(others.dt, 'tz', None) is not None:
+            others = others.dt.tz_localize(None)
+        parsed[~is_text] = others
+
+    if is_text.any():
+        text = uniques[is_text].str.strip()
+        fmt = detect_date_format(text)
+        if fmt:
+            converted = pd.to_datetime(text, format=fmt, errors='coerce')
+        else:
+            converted = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+        missing = converted.isna() & (text != '')
+        if missing.any():
+            converted[missing] = pd.to_datetime(
+                text[missing], dayfirst=dayfirst, errors='coerce', format='mixed'
+            )
+        if getattr(converted.dt, 'tz', None) is not None:
+            converted = converted.dt.tz_localize(None)
+        parsed[is_text] = converted
+
+    values = parsed.to_numpy(dtype='datetime64[ns]')
+    result = np.where(codes >= 0, values[codes], np.datetime64('NaT'))
+    return pd.Series(result, index=series.index, name=series.name, dtype='datetime64[ns]')
+
+
+def _legacy_numeric_chain(series: pd.Series) -> pd.Series:
+    """Cadeia antiga de `_preprocess_data`, mantida só para o benchmark."""
+    return (
+        series
+        .astype(str)
+        .str.replace(r'[^\d,]', '', regex=True)
+        .str.replace(',', '.')
+        .replace('', None)
+        .astype(float)
+    )
+
+
+if __name__ == "__main__":
+    print("=== Benchmark parse_br_numeric x cadeia antiga ===")
+    rng = np.random.default_rng(0)
+    n = 5_000_000
+    cents = rng.integers(-500_000, 5_000_000, size=n)
+    textos = pd.Series(
+        [f"{abs(c) // 100:,}".replace(',', '.') + f",{abs(c) % 100:02d}" for c in cents[:200_000]]
+    )
+    sinais = np.where(cents[:200_000] < 0, 'R$ -', 'R$ ')
+    amostra = (pd.Series(sinais) + textos)
+    coluna = pd.Series(np.resize(amostra.to_numpy(dtype=object), n), dtype=object)
+
+    t0 = time.perf_counter()
+    _legacy_numeric_chain(coluna)
+    t_old = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    valores, rejeitados = parse_br_numeric(coluna)
+    t_new = time.perf_counter() - t0
+
+    print(f"Linhas: {n:,}")
+    print(f"Cadeia antiga:    {t_old:.2f}s")
+    print(f"parse_br_numeric: {t_new:.2f}s ({t_old / t_new:.1f}x)")
+    print(f"Negativos: {(valores < 0).sum():,}  Rejeitados: {len(rejeitados):,}")
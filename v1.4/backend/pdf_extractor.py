@@ -0,0 +1,139 @@
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+import pandas as pd
+import pdfplumber
+
+from data.filecache import FileCache, file_cache
+
+
+class PdfTableExtractor:
+    """
+    Extrai as tabelas de vendas de extratos em PDF com o pdfplumber.
+
+    As páginas são divididas em faixas contíguas e processadas num pool de
+    processos. O resultado de cada página (linhas da tabela, já como texto)
+    fica em cache em disco, indexado pelo hash do arquivo, então reprocessar
+    o mesmo PDF só extrai as páginas que ainda não estão no cache.
+
+    O cabeçalho é reconhecido pelas colunas de `column_mapping`; páginas sem
+    cabeçalho continuam a tabela da página anterior.
+    """
+    EXTRACTOR_VERSION = '1'
+    MIN_PAGES_FOR_POOL = 8
+    # None = os.cpu_count(); processos que já são workers de outro pool usam 1
+    DEFAULT_PROCESSES = None
+    # Quantas colunas conhecidas uma linha precisa ter para ser cabeçalho
+    MIN_HEADER_MATCHES = 3
+
+    def __init__(self, column_mapping: Dict[str, str], processes: Optional[int] = None,
+                 cache_dir: Optional[str] = None):
+        self.column_mapping = column_mapping
+        self.known_headers = {self.normalize(h): h for h in column_mapping}
+        self.processes = processes or self.DEFAULT_PROCESSES or os.cpu_count() or 1
+        self.cache_dir = os.path.join(cache_dir or file_cache.cache_dir, 'pdf_pages')
+
+    @staticmethod
+    def normalize(text) -> str:
+        return re.sub(r'\s+', ' ', str(text or '')).strip().upper()
+
+    def extract(self, file_path: str) -> pd.DataFrame:
+        """Retorna um DataFrame com os cabeçalhos originais (chaves de column_mapping)."""
+        page_dir = os.path.join(
+            self.cache_dir, f"{FileCache.file_hash(file_path)}-v{self.EXTRACTOR_VERSION}"
+        )
+        with pdfplumber.open(file_path) as pdf:
+            num_pages = len(pdf.pages)
+
+        pages = {}
+        missing = []
+        for page_no in range(num_pages):
+            cached = self._read_page(page_dir, page_no)
+            if cached is None:
+                missing.append(page_no)
+            else:
+                pages[page_no] = cached
+        if pages:
+            print(f"DEBUG: {len(pages)}/{num_pages} página(s) do PDF vieram do cache")
+
+        for page_no, tables in self._extract_pages(file_path, missing).items():
+            pages[page_no] = tables
+            self._write_page(page_dir, page_no, tables)
+
+        return self._build_frame(pages[p] for p in range(num_pages))
+
+    def _extract_pages(self, file_path: str, page_numbers: List[int]) -> Dict[int, list]:
+        if not page_numbers:
+            return {}
+        if len(page_numbers) < self.MIN_PAGES_FOR_POOL or self.processes == 1:
+            return _extract_page_range(file_path, page_numbers)
+
+        # Faixas contíguas: cada processo abre o PDF uma vez só
+        n = min(self.processes, len(page_numbers))
+        size = -(-len(page_numbers) // n)
+        ranges = [page_numbers[i:i + size] for i in range(0, len(page_numbers), size)]
+        result = {}
+        with ProcessPoolExecutor(max_workers=n) as pool:
+            for part in pool.map(_extract_page_range, [file_path] * len(ranges), ranges):
+                result.update(part)
+        return result
+
+    def _build_frame(self, pages) -> pd.DataFrame:
+        header = None
+        rows = []
+        for tables in pages:
+            for table in tables:
+                for row in table:
+                    names = [self.normalize(c) for c in row]
+                    matches = sum(1 for c in names if c in self.known_headers)
+                    if matches >= self.MIN_HEADER_MATCHES:
+                        header = [self.known_headers.get(c, c) for c in names]
+                        continue
+                    if header is None or len(row) != len(header):
+                        continue
+                    if all(c in (None, '') for c in row):
+                        continue
+                    rows.append(row)
+        if header is None:
+            return pd.DataFrame()
+        df = pd.DataFrame(rows, columns=header)
+        # Cabeçalhos que não são colunas de vendas são descartados
+        return df[[c for c in df.columns if c in self.column_mapping]]
+
+    @staticmethod
+    def _read_page(page_dir: str, page_no: int) -> Optional[list]:
+        path = os.path.join(page_dir, f"{page_no}.json")
+        try:
+            with open(path, encoding='utf-8') as f:
+                tables = json.load(f)
+            os.utime(path)  # marca como usado recentemente (limite do FileCache)
+            return tables
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_page(page_dir: str, page_no: int, tables: list) -> None:
+        os.makedirs(page_dir, exist_ok=True)
+        path = os.path.join(page_dir, f"{page_no}.json")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(tables, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+def _extract_page_range(file_path: str, page_numbers: List[int]) -> Dict[int, list]:
+    """Executado nos processos do pool: {página: [tabela: [linha: [célula]]]}."""
+    result = {}
+    with pdfplumber.open(file_path) as pdf:
+        for page_no in page_numbers:
+            page = pdf.pages[page_no]
+            tables = page.extract_tables()
+            result[page_no] = [
+                [[(c.replace('\n', ' ').strip() if isinstance(c, str) else c) for c in row]
+                 for row in table]
+                for table in tables
+            ]
+            page.flush_cache()
+    return result
@@ -0,0 +1,94 @@
+from typing import Dict
+import pandas as pd
+from sqlalchemy import DateTime, Integer, Numeric, Table
+
+from backend.parsers import parse_br_numeric, parse_date_column
+from data.db import vendas
+
+
+class VendasSchema:
+    """
+    Tipos das colunas de vendas, derivados do mapeamento de cabeçalhos e da
+    definição da tabela `vendas`.
+
+    Texto de baixa cardinalidade vira `category` (agrupamentos passam a usar
+    os códigos inteiros), códigos como CÓD PV ficam sempre como texto e os
+    valores monetários como float64.
+    """
+    CATEGORICAL = {
+        'vendedor', 'status_cota', 'categoria', 'regra',
+        'nome_consorciado', 'bem', 'cod_equipe', 'parc_lib'
+    }
+
+    def __init__(self, column_mapping: Dict[str, str], table: Table = vendas):
+        self.column_mapping = column_mapping
+        self.kinds = {}
+        mapped = set(column_mapping.values())
+        for col in table.columns:
+            if col.name not in mapped:
+                continue
+            if isinstance(col.type, DateTime):
+                self.kinds[col.name] = 'datetime'
+            elif isinstance(col.type, Numeric):
+                self.kinds[col.name] = 'numeric'
+            elif isinstance(col.type, Integer):
+                self.kinds[col.name] = 'integer'
+            elif col.name in self.CATEGORICAL:
+                self.kinds[col.name] = 'category'
+            else:
+                self.kinds[col.name] = 'code'
+
+    def _names(self, raw_headers: bool) -> Dict[str, str]:
+        """{nome da coluna no DataFrame: nome na tabela}."""
+        if raw_headers:
+            return dict(self.column_mapping)
+        return {c: c for c in self.column_mapping.values()}
+
+    def read_dtypes(self, raw_headers: bool = True) -> Dict[str, object]:
+        """
+        Tipos para passar em `dtype=` de read_csv/read_excel.
+
+        Datas e valores monetários ficam de fora: chegam como texto no padrão
+        brasileiro e são convertidos depois pelos parsers.
+        """
+        dtypes = {}
+        for name, col in self._names(raw_headers).items():
+            kind = self.kinds.get(col)
+            if kind == 'category':
+                dtypes[name] = 'category'
+            elif kind == 'code':
+                dtypes[name] = str
+        return dtypes
+
+    def apply(self, df: pd.DataFrame, raw_headers: bool = False) -> pd.DataFrame:
+        """Força os tipos do schema num DataFrame já lido."""
+        for name, col in self._names(raw_headers).items():
+            if name not in df.columns:
+                continue
+            kind = self.kinds.get(col)
+            if kind == 'category':
+                if not isinstance(df[name].dtype, pd.CategoricalDtype):
+                    df[name] = df[name].astype('category')
+                df[name] = df[name].cat.remove_unused_categories()
+            elif kind == 'code' and df[name].dtype != object:
+                df[name] = df[name].map(_code_to_str, na_action='ignore').astype(object)
+            elif kind == 'numeric' and not pd.api.types.is_float_dtype(df[name]):
+                df[name], _ = parse_br_numeric(df[name])
+            elif kind == 'datetime' and not pd.api.types.is_datetime64_any_dtype(df[name]):
+                df[name] = parse_date_column(df[name])
+        return df
+
+    @staticmethod
+    def drop_null_tokens(df: pd.DataFrame, tokens) -> pd.DataFrame:
+        """Remove das colunas `category` as categorias que representam vazio."""
+        for name in df.select_dtypes('category').columns:
+            nulls = [c for c in df[name].cat.categories if c in tokens]
+            if nulls:
+                df[name] = df[name].cat.remove_categories(nulls)
+        return df
+
+
+def _code_to_str(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
@@ -0,0 +1,105 @@
+import os
+from typing import Tuple
+import numpy as np
+import pandas as pd
+
+# Linhas de rodapé/totalização que aparecem no meio dos relatórios
+INVALID_KEYWORDS = ["ENCERRAMENTO", "TOTAL", "DESCONTOS", r"R\$"]
+KEYWORD_PATTERN = '|'.join(INVALID_KEYWORDS)
+NUMERIC_PATTERN = r'^\s*\d+[\d.,]*\s*$'
+
+MOTIVO_VAZIO = 'vendedor vazio'
+MOTIVO_NAO_TEXTO = 'vendedor não é texto'
+MOTIVO_PALAVRA = 'linha de totalização'
+MOTIVO_NUMERICO = 'vendedor numérico'
+MOTIVO_VALOR = 'valor numérico inválido'
+
+# Relatórios CSV das linhas (e células) descartadas na leitura dos arquivos.
+# Ficam fora do cache (a interface indica o caminho ao usuário, então o
+# limite por tamanho do FileCache não pode apagá-los); só os
+# REJECTED_KEEP mais recentes são mantidos.
+REJECTED_DIR = os.getenv("DW_REJECTED_DIR", os.path.join(
+    os.path.expanduser('~'), '.local', 'share', 'datawarehouse-system', 'rejeitadas'))
+REJECTED_KEEP = int(os.getenv("DW_REJECTED_KEEP", "200"))
+
+
+def classify_vendedor(vendedor: pd.Series) -> pd.Series:
+    """
+    Classifica cada linha pelo valor de vendedor: NaN para linhas válidas ou
+    o motivo da rejeição.
+
+    As regras rodam uma vez sobre os valores distintos (categorias ou
+    factorize) e o resultado volta para as linhas pelos códigos, então o
+    custo cresce com o número de nomes distintos e não com o de linhas.
+    """
+    if isinstance(vendedor.dtype, pd.CategoricalDtype):
+        codes = vendedor.cat.codes.to_numpy()
+        uniques = pd.Series(vendedor.cat.categories.to_numpy(dtype=object))
+    else:
+        codes, uniques = pd.factorize(vendedor, use_na_sentinel=True)
+        uniques = pd.Series(np.asarray(uniques, dtype=object))
+
+    reasons = pd.Series(np.nan, index=uniques.index, dtype=object)
+    is_text = uniques.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    reasons[~is_text] = MOTIVO_NAO_TEXTO
+
+    text = uniques[is_text]
+    reasons[text.index[text.str.strip() == '']] = MOTIVO_VAZIO
+    reasons[text.index[text.str.upper().str.contains(KEYWORD_PATTERN, regex=True)
+                       & reasons[text.index].isna()]] = MOTIVO_PALAVRA
+    reasons[text.index[text.str.match(NUMERIC_PATTERN)
+                       & reasons[text.index].isna()]] = MOTIVO_NUMERICO
+
+    # Código -1 = vendedor nulo
+    table = np.append(reasons.to_numpy(dtype=object), MOTIVO_VAZIO)
+    return pd.Series(table[codes], index=vendedor.index, name='motivo', dtype=object)
+
+
+def split_valid_rows(df: pd.DataFrame, column: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Separa as linhas válidas das rejeitadas pela coluna de vendedor.
+
+    Returns:
+        (validas, rejeitadas): `rejeitadas` traz as colunas originais mais
+        'motivo'.
+    """
+    motivo = classify_vendedor(df[column])
+    mask = motivo.isna().to_numpy()
+    rejected = df.loc[~mask].copy()
+    rejected['motivo'] = motivo[~mask]
+    return df.loc[mask], rejected
+
+
+def write_rejected_csv(rejected: pd.DataFrame, origem_arquivo: str, report_dir: str,
+                       key: str, kind: str = 'rejeitadas') -> str:
+    """
+    Grava o relatório de linhas rejeitadas de um arquivo e retorna o caminho.
+
+    `key` (hash do conteúdo ou batch_id) entra no nome, para que dois
+    arquivos com o mesmo nome não sobrescrevam o relatório um do outro;
+    `kind` separa relatórios diferentes do mesmo arquivo.
+    """
+    os.makedirs(report_dir, exist_ok=True)
+    path = os.path.join(report_dir,
+                        f"{os.path.basename(origem_arquivo)}.{key[:12]}.{kind}.csv")
+    rejected.rename_axis('linha').to_csv(path, sep=';', encoding='utf-8-sig')
+    _prune_reports(report_dir, keep=path)
+    return path
+
+
+def _prune_reports(report_dir: str, keep: str) -> None:
+    """Apaga os relatórios mais antigos além de REJECTED_KEEP (nunca o que acabou de ser gravado)."""
+    reports = []
+    for name in os.listdir(report_dir):
+        path = os.path.join(report_dir, name)
+        if name.endswith('.csv') and path != keep:
+            try:
+                reports.append((os.stat(path).st_mtime, path))
+            except FileNotFoundError:
+                continue
+    reports.sort(reverse=True)
+    for _, path in reports[max(REJECTED_KEEP - 1, 0):]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
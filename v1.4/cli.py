@@ -0,0 +1,164 @@
+"""
+Ingestão em linha de comando, sem interface gráfica (não importa tkinter).
+
+Exemplos:
+    python cli.py vendas_marco.xlsx
+    python cli.py "entradas/**/*.csv" --jobs 4
+    python cli.py extratos/ --chunk-size 100000 --dry-run
+    python cli.py comissoes_2025.csv --resumable
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backend.dataloader_db import DataLoader_db
+from backend.validation import classify_vendedor
+from data.bulk_import import bulk_import, find_files
+
+
+class _TimedChunks:
+    """
+    Itera os blocos medindo o tempo gasto esperando leitura/tratamento e
+    contando as linhas que serão gravadas e as rejeitadas (mesma regra de
+    `_clean_vendas`, então `rows` bate com uploads.num_registros).
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.wait_s = 0.0
+        self.rows = 0
+        self.rejected = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            chunk = next(self.chunks)
+        finally:
+            self.wait_s += time.perf_counter() - start
+        rejected = int(classify_vendedor(chunk['vendedor']).notna().sum()) \
+            if 'vendedor' in chunk.columns else 0
+        self.rows += len(chunk) - rejected
+        self.rejected += rejected
+        return chunk
+
+
+def _expand(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True)
+        paths.extend(matches if matches else [pattern])
+    return find_files(paths)
+
+
+def _ingest_sequential(files, chunk_size, dry_run, method, resumable=False):
+    from data.db import insert_upload_and_vendas_stream
+    from data.filecache import FileCache
+    from data.staging import insert_upload_and_vendas_resumable
+
+    results = []
+    for path in files:
+        summary = {'arquivo': path, 'status': 'ok', 'batch_id': None, 'linhas': 0,
+                   'rejeitadas': 0, 'leitura_s': 0.0, 'gravacao_s': 0.0, 'erro': None}
+        start = time.perf_counter()
+        chunks = _TimedChunks(DataLoader_db.load_db_chunks(path, chunk_size=chunk_size))
+        try:
+            if dry_run:
+                for _ in chunks:
+                    pass
+            elif resumable:
+                resume_key = f"{FileCache.file_hash(path)}-{DataLoader_db.LOADER_VERSION}"
+                summary['batch_id'] = insert_upload_and_vendas_resumable(
+                    chunks, path, resume_key, chunk_size, method=method
+                )
+            else:
+                summary['batch_id'] = insert_upload_and_vendas_stream(chunks, path, method=method)
+        except Exception as e:
+            summary['status'] = 'erro'
+            summary['erro'] = f"{type(e).__name__}: {e}"
+        total = time.perf_counter() - start
+        summary['linhas'] = chunks.rows
+        summary['rejeitadas'] = chunks.rejected
+        summary['leitura_s'] = chunks.wait_s
+        summary['gravacao_s'] = total - chunks.wait_s
+        results.append(summary)
+        _print_file(summary)
+    return results
+
+
+def _print_file(r):
+    name = os.path.basename(r['arquivo'])
+    if r['status'] == 'ok':
+        print(f"OK    {name}: {r['linhas']} linhas"
+              + (f" ({r['rejeitadas']} rejeitadas)" if r['rejeitadas'] else "")
+              + "  "
+              f"(leitura+tratamento {r['leitura_s']:.2f}s, gravação {r['gravacao_s']:.2f}s)"
+              + (f"  lote {r['batch_id']}" if r['batch_id'] else ""))
+    else:
+        print(f"ERRO  {name}: {r['erro']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Importa arquivos de vendas (CSV, Excel, PDF) para o banco de dados."
+    )
+    parser.add_argument('arquivos', nargs='+',
+                        help="arquivos, pastas ou padrões glob (use aspas para '**')")
+    parser.add_argument('--chunk-size', type=int, default=DataLoader_db.CHUNK_SIZE,
+                        help="linhas por bloco na leitura em streaming (padrão: %(default)s)")
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help="processos de leitura em paralelo; com mais de 1, cada arquivo "
+                             "é lido inteiro num processo (padrão: %(default)s)")
+    parser.add_argument('--method', choices=['auto', 'copy', 'executemany'], default=None,
+                        help="caminho de gravação (padrão: VENDAS_BULK_LOAD ou auto)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="lê e trata os arquivos sem gravar no banco")
+    parser.add_argument('--resumable', action='store_true',
+                        help="grava via staging com checkpoint por bloco; rodar de novo "
+                             "retoma um envio interrompido (apenas com --jobs 1)")
+    args = parser.parse_args(argv)
+    if args.resumable and args.jobs > 1:
+        parser.error("--resumable só funciona com --jobs 1")
+
+    files = _expand(args.arquivos)
+    if not files:
+        print("Nenhum arquivo suportado encontrado.", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    if args.jobs > 1:
+        results = bulk_import(files, processes=args.jobs, dry_run=args.dry_run,
+                              method=args.method)
+        for r in results:
+            _print_file(r)
+    else:
+        if not args.dry_run:
+            from data.db import init_db
+            init_db()  # cria as tabelas e aplica as migrações pendentes
+        results = _ingest_sequential(files, args.chunk_size, args.dry_run, args.method,
+                                     args.resumable)
+    elapsed = time.perf_counter() - start
+
+    ok = [r for r in results if r['status'] == 'ok']
+    rows = sum(r['linhas'] for r in ok)
+    print()
+    print(f"Arquivos: {len(ok)}/{len(results)} ok" + ("  (dry-run)" if args.dry_run else ""))
+    print(f"Linhas:   {rows}" + ("" if args.dry_run else " gravadas")
+          + f"  (rejeitadas: {sum(r['rejeitadas'] for r in ok)})")
+    print(f"Tempo:    {elapsed:.2f}s  ({rows / elapsed if elapsed else 0:,.0f} linhas/s)")
+    print(f"Etapas:   leitura+tratamento {sum(r['leitura_s'] for r in ok):.2f}s"
+          + (" (soma dos processos)" if args.jobs > 1 else "")
+          + f", gravação {sum(r['gravacao_s'] for r in ok):.2f}s")
+    return 0 if len(ok) == len(results) else 1
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
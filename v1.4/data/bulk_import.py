@@ -0,0 +1,114 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional
+
+from backend.dataloader_db import DataLoader_db
+from backend.pdf_extractor import PdfTableExtractor
+from backend.validation import classify_vendedor
+from data.db import dispose_engine, init_db, insert_upload_and_vendas
+from data.filecache import file_cache
+
+
+def find_files(paths: Iterable[str]) -> List[str]:
+    """
+    Expande arquivos e pastas (recursivamente) na lista de arquivos suportados,
+    em ordem alfabética e sem repetições.
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in files:
+                    if os.path.splitext(name)[1].lower() in DataLoader_db.SUPPORTED_EXTENSIONS:
+                        found.append(os.path.join(root, name))
+        elif os.path.splitext(path)[1].lower() in DataLoader_db.SUPPORTED_EXTENSIONS:
+            found.append(path)
+    return sorted(dict.fromkeys(os.path.abspath(p) for p in found))
+
+
+def _init_worker():
+    # Com fork o worker herda as conexões abertas pelo init_db do processo
+    # principal: descarta sem fechar (fechar encerraria as do pai)
+    dispose_engine(close=False)
+    # Já estamos num processo do pool: o PDF é lido sem abrir outro pool
+    PdfTableExtractor.DEFAULT_PROCESSES = 1
+
+
+def _parse_file(file_path: str):
+    """Executado nos processos do pool: lê e trata um arquivo."""
+    start = time.perf_counter()
+    df = file_cache.load(file_path, DataLoader_db.load_db, DataLoader_db.LOADER_VERSION)
+    return df, time.perf_counter() - start
+
+
+def bulk_import(paths: Iterable[str], processes: Optional[int] = None,
+                dry_run: bool = False, method: Optional[str] = None) -> List[Dict]:
+    """
+    Importa vários arquivos (ou pastas) para o banco, um lote `uploads` por arquivo.
+
+    Os arquivos são lidos e tratados em paralelo num pool de processos; o
+    processo principal grava cada DataFrame assim que ele fica pronto. No
+    máximo 2 arquivos por processo ficam em memória aguardando gravação.
+    A falha de um arquivo não interrompe os demais. Com `dry_run` os arquivos
+    são só lidos e tratados; senão init_db() roda antes da primeira gravação.
+    `method` é repassado a insert_upload_and_vendas.
+
+    Returns:
+        Um resumo por arquivo: {'arquivo', 'status', 'batch_id', 'linhas', 'rejeitadas',
+        'leitura_s', 'gravacao_s', 'erro'}.
+    """
+    files = find_files(paths)
+    if files and not dry_run:
+        # Fora da interface ninguém chamou init_db (ex.: cli.py --jobs)
+        init_db()
+    processes = processes or os.cpu_count() or 1
+    results = []
+    pending = {}
+    queue = list(reversed(files))
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as pool:
+        while queue or pending:
+            while queue and len(pending) < processes * 2:
+                path = queue.pop()
+                pending[pool.submit(_parse_file, path)] = path
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                summary = {'arquivo': path, 'status': 'ok', 'batch_id': None, 'linhas': 0,
+                           'rejeitadas': 0, 'leitura_s': 0.0, 'gravacao_s': 0.0, 'erro': None}
+                try:
+                    df, summary['leitura_s'] = future.result()
+                    # Mesma regra de _clean_vendas: 'linhas' = o que vai para o banco
+                    if 'vendedor' in df.columns:
+                        summary['rejeitadas'] = int(classify_vendedor(df['vendedor']).notna().sum())
+                    summary['linhas'] = len(df) - summary['rejeitadas']
+                    if not dry_run:
+                        start = time.perf_counter()
+                        summary['batch_id'] = insert_upload_and_vendas(df, path, method=method)
+                        summary['gravacao_s'] = time.perf_counter() - start
+                    del df
+                except Exception as e:
+                    summary['status'] = 'erro'
+                    summary['erro'] = f"{type(e).__name__}: {e}"
+                print(f"DEBUG: {os.path.basename(path)} -> {summary['status']}")
+                results.append(summary)
+
+    results.sort(key=lambda r: r['arquivo'])
+    return results
+
+
+def format_summary(results: List[Dict]) -> str:
+    """Texto com uma linha por arquivo e o total, para exibir ao usuário."""
+    lines = []
+    for r in results:
+        name = os.path.basename(r['arquivo'])
+        if r['status'] == 'ok':
+            lines.append(f"OK    {name}: {r['linhas']} linhas"
+                         + (f" ({r['rejeitadas']} rejeitadas)" if r.get('rejeitadas') else ""))
+        else:
+            lines.append(f"ERRO  {name}: {r['erro']}")
+    ok = sum(1 for r in results if r['status'] == 'ok')
+    lines.append(f"{ok}/{len(results)} arquivo(s) importado(s)")
+    return "\n".join(lines)
@@ -1,15 +1,20 @@
 # db.py
+import io
 import os
 import uuid
 from datetime import datetime
 import pandas as pd
 import numpy as np
 import re
-from sqlalchemy import (create_engine, Column, Integer, String, DateTime,
-                        Numeric, MetaData, Table)
+from sqlalchemy import (create_engine, Column, Integer, String, Date, DateTime,
+                        Numeric, MetaData, Table, ForeignKey, UniqueConstraint, Index)
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from dotenv import load_dotenv
-from sqlalchemy import select
+from sqlalchemy import and_, func, or_, select, tuple_
+
+from backend.validation import split_valid_rows
 
 # data/db.py
 import sys
@@ -29,20 +34,212 @@ dotenv_path = os.path.join(base_path, 'data', '.env')
 # 3) Carregue as variáveis de ambiente
 load_dotenv(dotenv_path)
 
-# 4) Pegue a string do DATABASE_URL
-DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
-    raise RuntimeError(f"Não encontrou DATABASE_URL em {dotenv_path}")
+# 4) Estratégia de carga em massa da tabela vendas:
+#    'auto' usa COPY no PostgreSQL (psycopg2) e executemany nos demais dialetos;
+#    'copy' ou 'executemany' forçam um dos caminhos.
+BULK_LOAD_METHOD = os.getenv("VENDAS_BULK_LOAD", "auto").lower()
+
+# 5) A engine só é criada no primeiro uso (modo Local nunca conecta).
+#    Pool configurável por variáveis de ambiente:
+#      DB_POOL_SIZE / DB_MAX_OVERFLOW  tamanho do pool (padrão 5 / 10)
+#      DB_POOL_RECYCLE                 segundos até reciclar a conexão (padrão 1800)
+#      DB_POOL_TIMEOUT                 espera por uma conexão livre (padrão 30)
+#      DB_POOL_PRE_PING                testa a conexão antes de usar (padrão 1)
+#      DB_NULLPOOL=1                   sem pool local, para pgbouncer / pooler do Supabase
+POOL_SETTINGS = {
+    'pool_size': int(os.getenv("DB_POOL_SIZE", "5")),
+    'max_overflow': int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    'pool_recycle': int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    'pool_timeout': int(os.getenv("DB_POOL_TIMEOUT", "30")),
+    'pool_pre_ping': os.getenv("DB_POOL_PRE_PING", "1") not in ("0", "false", "False"),
+    'nullpool': os.getenv("DB_NULLPOOL", "0") in ("1", "true", "True"),
+}
+
+_engine = None
+_sessionmaker = None
+
+
+def create_db_engine(url=None, pool_size=None, max_overflow=None, pool_recycle=None,
+                     pool_timeout=None, pool_pre_ping=None, nullpool=None, echo=False):
+    """
+    Cria uma engine com as opções de pool; argumentos omitidos usam POOL_SETTINGS.
+
+    Com `nullpool` cada sessão abre e fecha a própria conexão, deixando o
+    pooling para o pgbouncer/pooler. No SQLite o tamanho do pool é ignorado.
+    """
+    url = url or os.getenv("DATABASE_URL")
+    if not url:
+        raise RuntimeError(f"Não encontrou DATABASE_URL em {dotenv_path}")
+
+    def opt(name, value):
+        return POOL_SETTINGS[name] if value is None else value
+
+    kwargs = {'echo': echo, 'pool_pre_ping': opt('pool_pre_ping', pool_pre_ping)}
+    if opt('nullpool', nullpool):
+        kwargs['poolclass'] = NullPool
+    elif make_url(url).get_backend_name() != 'sqlite':
+        kwargs.update(
+            pool_size=opt('pool_size', pool_size),
+            max_overflow=opt('max_overflow', max_overflow),
+            pool_recycle=opt('pool_recycle', pool_recycle),
+            pool_timeout=opt('pool_timeout', pool_timeout),
+        )
+    return create_engine(url, **kwargs)
+
+
+def get_engine():
+    """Engine compartilhada do processo, criada na primeira chamada."""
+    global _engine, _sessionmaker
+    if _engine is None:
+        _engine = create_db_engine()
+        _sessionmaker = sessionmaker(bind=_engine)
+        print(f"DEBUG: Engine criada ({_engine.dialect.name}, {type(_engine.pool).__name__})")
+    return _engine
+
+
+def configure_engine(url=None, **options):
+    """Troca a engine compartilhada (ex.: outra URL ou NullPool); descarta a anterior."""
+    global _engine, _sessionmaker
+    dispose_engine()
+    _engine = create_db_engine(url, **options)
+    _sessionmaker = sessionmaker(bind=_engine)
+    return _engine
+
+
+def dispose_engine(close=True):
+    """
+    Fecha as conexões do pool (ex.: antes de um fork ou ao sair). Com
+    `close=False`, num processo filho criado por fork, só descarta as
+    conexões herdadas, sem fechar as que o processo pai continua usando.
+    """
+    global _engine, _sessionmaker
+    if _engine is not None:
+        _engine.dispose(close=close)
+        # Os resultados em memória são da engine descartada
+        querycache = sys.modules.get('data.querycache')
+        if querycache is not None:
+            querycache.query_cache.clear(disk=False)
+    _engine = None
+    _sessionmaker = None
+
+
+def Session(**kwargs):
+    """Nova sessão na engine compartilhada (aceita `with Session() as s:`)."""
+    if _sessionmaker is None:
+        get_engine()
+    return _sessionmaker(**kwargs)
+
+
+def __getattr__(name):
+    # Compatibilidade: `from data.db import engine` continua funcionando,
+    # mas só cria a engine quando alguém realmente a pede.
+    if name == 'engine':
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-# 5) Crie a engine normalmente
-engine = create_engine(DATABASE_URL, echo=False, future=True)
-Session = sessionmaker(bind=engine)
 metadata = MetaData()
-vendas = Table(
-    'vendas', metadata,
+
+# Esquema estrela: vendas_fato guarda só chaves inteiras, datas e valores;
+# os textos repetidos ficam nas dimensões, resolvidos em bloco na ingestão
+# (data/dimensions.py). `vendas` virou uma visão com as colunas antigas.
+dim_vendedor = Table(
+    'dim_vendedor', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('nome', String, nullable=False, unique=True),
+)
+
+# Vazios viram '' (a visão devolve NULL) para a chave natural ser única
+dim_consorciado = Table(
+    'dim_consorciado', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('consorciado', String, nullable=False),
+    Column('nome_consorciado', String, nullable=False, index=True),
+    UniqueConstraint('consorciado', 'nome_consorciado', name='uq_dim_consorciado'),
+)
+
+dim_bem = Table(
+    'dim_bem', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('bem', String, nullable=False, unique=True),
+)
+
+# Chave no formato AAAAMMDD, calculada direto da data (sem consulta)
+dim_data = Table(
+    'dim_data', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=False),
+    Column('data', Date, nullable=False),
+    Column('ano', Integer),
+    Column('mes', Integer),
+    Column('dia', Integer),
+    Column('trimestre', Integer),
+)
+
+vendas_fato = Table(
+    'vendas_fato', metadata,
     Column('id', Integer, primary_key=True, autoincrement=True),
     Column('batch_id', String, index=True),
-    Column('data_upload', DateTime, default=datetime.utcnow),
+    Column('data_venda', DateTime),
+    Column('data_venda_id', Integer, ForeignKey('dim_data.id')),
+    Column('data_alocacao', DateTime),
+    Column('vendedor_id', Integer, ForeignKey('dim_vendedor.id')),
+    Column('consorciado_id', Integer, ForeignKey('dim_consorciado.id')),
+    Column('bem_id', Integer, ForeignKey('dim_bem.id')),
+    Column('cod_comissionado', String),
+    Column('cod_pv', String),
+    Column('cod_equipe', String),
+    Column('contrato', String),
+    Column('status_cota', String),
+    Column('parc_lib', String),
+    Column('regra', String),
+    Column('categoria', String),
+    Column('comissao_percentual', Numeric),
+    Column('base_calc_comissao', Numeric),
+    Column('comissao_reais', Numeric),
+    Column('estorno_reais', Numeric),
+    Column('cancelamento_cota_reais', Numeric),
+    Column('base_reais', Numeric),
+    Column('liquido_reais', Numeric),
+)
+
+# Resumos mantidos na ingestão (data/rollups.py): os filtros rápidos do modo
+# banco leem daqui, com custo proporcional ao número de grupos. Chaves nulas
+# viram 0 / '' para que (mes, vendedor, consorciado, status) seja a chave primária.
+resumo_lote = Table(
+    'resumo_lote', metadata,
+    Column('batch_id', String, primary_key=True),
+    Column('vendedor_id', Integer, primary_key=True),
+    Column('consorciado_id', Integer, primary_key=True),
+    Column('status_cota', String, primary_key=True),
+    Column('liquido_reais', Numeric),
+    Column('base_reais', Numeric),
+    Column('comissao_reais', Numeric),
+    Column('estorno_reais', Numeric),
+    Column('num_vendas', Integer),
+)
+
+resumo_mensal = Table(
+    'resumo_mensal', metadata,
+    Column('mes', Integer, primary_key=True),  # AAAAMM, 0 = sem data_venda
+    Column('vendedor_id', Integer, primary_key=True),
+    Column('consorciado_id', Integer, primary_key=True),
+    Column('status_cota', String, primary_key=True),
+    Column('liquido_reais', Numeric),
+    Column('base_reais', Numeric),
+    Column('comissao_reais', Numeric),
+    Column('estorno_reais', Numeric),
+    Column('num_vendas', Integer),
+)
+
+# Visão de compatibilidade (criada pela migração 002, fora de `metadata`):
+# mesmas colunas da antiga tabela vendas, então select(vendas) continua
+# funcionando. Gravações vão para vendas_fato.
+view_metadata = MetaData()
+vendas = Table(
+    'vendas', view_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('batch_id', String),
+    Column('data_upload', DateTime),
     Column('origem_arquivo', String),
     Column('data_venda', DateTime),
     Column('data_alocacao', DateTime),
@@ -75,33 +272,132 @@ uploads = Table(
     Column('num_registros', Integer),
 )
 
+# Linhas descartadas na ingestão (totalizações, rodapés...) e o motivo
+vendas_rejeitadas = Table(
+    'vendas_rejeitadas', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('batch_id', String, index=True),
+    Column('origem_arquivo', String),
+    Column('linha', Integer),
+    Column('motivo', String),
+    Column('vendedor', String),
+    Column('conteudo', String),
+)
+
+# Versão do armazém (uma linha, id = 1): incrementada na mesma transação de
+# cada lote gravado; faz parte da chave do cache de consultas (data/querycache.py).
+versao_dw = Table(
+    'versao_dw', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=False),
+    Column('versao', Integer, nullable=False),
+)
+
+# Índices das consultas de backend/db_filters.py e deste módulo. Em bancos
+# novos o create_all já os cria; nos existentes a migração correspondente
+# cria com CONCURRENTLY (data/migrations.py).
+FATO_INDEXES = [
+    # filter_by_year_db: data_venda >= :inicio AND data_venda < :fim
+    Index('ix_vendas_fato_data_venda', vendas_fato.c.data_venda),
+    # filter_status_atraso_db: status_cota <> 'A' (índice parcial, só as em atraso)
+    Index('ix_vendas_fato_em_atraso', vendas_fato.c.status_cota, vendas_fato.c.data_venda,
+          postgresql_where=vendas_fato.c.status_cota != 'A',
+          sqlite_where=vendas_fato.c.status_cota != 'A'),
+    # total_liquido_por_vendedor_db: GROUP BY vendedor_id, SUM(liquido_reais)
+    Index('ix_vendas_fato_vendedor_liquido', vendas_fato.c.vendedor_id,
+          vendas_fato.c.liquido_reais),
+    # total_liquido_por_consorcio_vendedor_db / relatorio_por_consorciado_db
+    Index('ix_vendas_fato_consorciado_vendedor', vendas_fato.c.consorciado_id,
+          vendas_fato.c.vendedor_id, vendas_fato.c.liquido_reais),
+]
+
+UPLOADS_INDEXES = [
+    # query_vendas_by_name: uploads.origem_arquivo = :nome
+    Index('ix_uploads_origem_arquivo', uploads.c.origem_arquivo),
+    # list_uploads: ORDER BY data_upload DESC, id DESC com cursor (paginação por chave)
+    Index('ix_uploads_data_upload_id', uploads.c.data_upload, uploads.c.id),
+    # list_uploads(prefix=...): lower(origem_arquivo) LIKE 'abc%' (text_pattern_ops
+    # deixa o PostgreSQL usar o índice no LIKE com qualquer collation)
+    Index('ix_uploads_origem_prefixo', func.lower(uploads.c.origem_arquivo).label('origem_lower'),
+          postgresql_ops={'origem_lower': 'text_pattern_ops'}),
+]
+
 def init_db():
-    metadata.create_all(engine)
+    """
+    Cria as tabelas e aplica as migrações pendentes (índices, esquema
+    estrela). Com VENDAS_PARTITIONED=1 (PostgreSQL), vendas_fato é criada
+    particionada por mês.
+    """
+    from data.migrations import run_migrations
+    from data.partitioning import PARTITIONED, init_partitioned
+    if PARTITIONED:
+        init_partitioned()
+    metadata.create_all(get_engine())
+    run_migrations()
 
-def insert_upload_and_vendas(df, origem_arquivo):
-    """Insere um lote (upload) + linhas de vendas."""
-    batch_id = str(uuid.uuid4())
-    sess = Session()
+def date_range(column, start, end):
+    """
+    Predicado `start <= column < end` (sargável: usa o índice de data_venda
+    e, com vendas_fato particionada, o planejador só lê as partições do período).
+    """
+    return and_(column >= start, column < end)
 
-    invalid_keywords = ["ENCERRAMENTO", "TOTAL", "DESCONTOS", "R\$"]
-    keyword_pattern = '|'.join(invalid_keywords)
-    regex_numeric = r'^\s*\d+[\d.,]*\s*$'
+def year_range(column, year):
+    """Filtro por ano como intervalo, em vez de extract(year from column) = year."""
+    year = int(year)
+    return date_range(column, datetime(year, 1, 1), datetime(year + 1, 1, 1))
 
-    df = df[df['vendedor'].apply(lambda x: isinstance(x, str) and x.strip() != "")]
-    df = df[~df['vendedor'].str.upper().str.contains(keyword_pattern, regex=True)]
-    df = df[~df['vendedor'].str.match(regex_numeric)]
+def _clean_vendas(df, offset=0):
+    """
+    Separa as linhas de totalização/rodapé e troca NaN/NaT por None.
 
-    records = df.replace({pd.NaT: None})
+    As linhas são numeradas a partir de `offset` (linhas dos blocos
+    anteriores), para que a 'linha' das rejeitadas seja a posição no arquivo
+    e não no bloco.
+
+    Returns:
+        (records, rejeitadas)
+    """
+    df = df.set_axis(pd.RangeIndex(offset, offset + len(df)))
+    df, rejected = split_valid_rows(df, 'vendedor')
+
+    # Colunas tipadas (category, float) viram object para que os vazios
+    # sejam gravados como NULL, e não como NaN
+    records = df.astype(object)
+    records = records.replace({pd.NaT: None})
     records = records.where(pd.notnull(records), None)
+    return records, rejected
 
-    sess.execute(uploads.insert().values(
-        id=batch_id,
-        origem_arquivo=os.path.basename(origem_arquivo),
-        num_registros=len(df)
-    ))
+def _insert_rejected(sess, rejected, batch_id, origem_arquivo):
+    if rejected.empty:
+        return
+    conteudo = rejected.drop(columns='motivo').to_json(
+        orient='records', lines=True, date_format='iso', force_ascii=False
+    ).splitlines()
+    vendedor = rejected['vendedor'].astype(object)
+    sess.execute(vendas_rejeitadas.insert(), [
+        {
+            'batch_id': batch_id,
+            'origem_arquivo': os.path.basename(origem_arquivo),
+            'linha': int(linha),
+            'motivo': motivo,
+            'vendedor': None if pd.isna(v) else str(v),
+            'conteudo': c,
+        }
+        for linha, motivo, v, c in zip(rejected.index, rejected['motivo'], vendedor, conteudo)
+    ])
 
+def _insert_vendas_chunk(sess, records, batch_id, method='executemany', table=vendas_fato):
+    """Resolve as chaves das dimensões e grava o bloco na tabela fato (ou no staging)."""
+    from data.dimensions import to_fact_rows
     records['batch_id'] = batch_id
-    records['origem_arquivo'] = os.path.basename(origem_arquivo)
+    _write_fact_rows(sess, to_fact_rows(sess, records), method, table)
+
+def _write_fact_rows(sess, records, method='executemany', table=vendas_fato):
+    records = records[[c.name for c in table.columns if c.name in records.columns]]
+
+    if method == 'copy':
+        _copy_vendas_chunk(sess, records, table)
+        return
 
     data_to_insert = records.to_dict(orient='records')
 
@@ -110,35 +406,174 @@ def insert_upload_and_vendas(df, origem_arquivo):
             if isinstance(value, (np.generic)):
                 item[key] = value.item()
 
-    sess.execute(vendas.insert(), data_to_insert)
-    sess.commit()
-    sess.close()
-    return batch_id
+    if data_to_insert:
+        sess.execute(table.insert(), data_to_insert)
+
+def _copy_vendas_chunk(sess, records, table=vendas_fato):
+    """Carrega o bloco via COPY FROM STDIN usando um CSV em memória."""
+    if records.empty:
+        return
+    columns = [c.name for c in table.columns if c.name in records.columns and c.name != 'id']
+
+    buf = io.StringIO()
+    records[columns].to_csv(buf, index=False, header=False, na_rep='\\N',
+                            date_format='%Y-%m-%d %H:%M:%S.%f')
+    buf.seek(0)
+
+    sql = (f"COPY {table.name} ({', '.join(columns)}) "
+           "FROM STDIN WITH (FORMAT csv, NULL '\\N')")
+    # Usa a mesma conexão (e transação) da sessão
+    dbapi_conn = sess.connection().connection.dbapi_connection
+    with dbapi_conn.cursor() as cur:
+        cur.copy_expert(sql, buf)
+
+def _resolve_bulk_method(sess, method=None):
+    method = (method or BULK_LOAD_METHOD).lower()
+    if method not in ('auto', 'copy', 'executemany'):
+        raise ValueError(f"Método de carga inválido: {method}")
+    bind = sess.get_bind()
+    is_psycopg2 = bind.dialect.name == 'postgresql' and bind.dialect.driver == 'psycopg2'
+    if method == 'auto':
+        return 'copy' if is_psycopg2 else 'executemany'
+    if method == 'copy' and not is_psycopg2:
+        raise ValueError("COPY só é suportado em PostgreSQL com psycopg2")
+    return method
+
+def bump_warehouse_version(sess):
+    """Incrementa a versão do armazém (chamar na transação que grava o lote)."""
+    updated = sess.execute(
+        versao_dw.update().where(versao_dw.c.id == 1).values(versao=versao_dw.c.versao + 1)
+    ).rowcount
+    if not updated:
+        sess.execute(versao_dw.insert().values(id=1, versao=1))
 
-def query_vendas_by_batch(batch_id):
-    """Retorna DataFrame de todas as vendas desse lote."""
-    import pandas as pd
+def get_warehouse_version():
+    """Versão atual do armazém (0 se nenhum lote foi gravado desde a migração)."""
+    with get_engine().connect() as conn:
+        return conn.execute(select(versao_dw.c.versao).where(versao_dw.c.id == 1)).scalar() or 0
+
+def insert_upload_and_vendas(df, origem_arquivo, method=None):
+    """Insere um lote (upload) + linhas de vendas."""
+    return insert_upload_and_vendas_stream([df], origem_arquivo, method=method)
+
+def insert_upload_and_vendas_stream(chunks, origem_arquivo, method=None):
+    """
+    Insere um lote (upload) a partir de um iterável de DataFrames.
+
+    Cada bloco é limpo e inserido assim que chega, mas tudo roda numa única
+    transação: ou o lote inteiro (uploads + vendas + resumos + versão) é gravado sob
+    o mesmo batch_id, ou nada é. As linhas descartadas vão para vendas_rejeitadas
+    com o motivo.
+
+    `method` escolhe o caminho de escrita ('auto', 'copy' ou 'executemany');
+    sem ele vale a variável de ambiente VENDAS_BULK_LOAD.
+    """
+    from data.rollups import update_rollups
+    batch_id = str(uuid.uuid4())
     sess = Session()
-    res = sess.execute(vendas.select().where(vendas.c.batch_id == batch_id)).mappings().all()
-    sess.close()
-    return pd.DataFrame(res)
-def query_vendas_by_name(origem_arquivo):
-    import pandas as pd
-    session = Session()
-
-    # Buscar o batch_id (id da tabela uploads) com base na origem_arquivo
-    batch_id = session.execute(
-        select(uploads.c.id).where(uploads.c.origem_arquivo == origem_arquivo)
-    ).scalar_one_or_none()
-
-    if not batch_id:
-        session.close()
-        return pd.DataFrame()  # Nenhum upload encontrado
-
-    # Agora buscar todas as vendas com esse batch_id
-    res = session.execute(
-        select(vendas).where(vendas.c.batch_id == batch_id)
-    ).mappings().all()
-
-    session.close()
-    return pd.DataFrame(res)
+    total = 0
+    try:
+        method = _resolve_bulk_method(sess, method)
+        sess.execute(uploads.insert().values(
+            id=batch_id,
+            origem_arquivo=os.path.basename(origem_arquivo),
+            num_registros=0
+        ))
+
+        offset = 0
+        for chunk in chunks:
+            records, rejected = _clean_vendas(chunk, offset)
+            offset += len(chunk)
+            total += len(records)
+            _insert_vendas_chunk(sess, records, batch_id, method)
+            _insert_rejected(sess, rejected, batch_id, origem_arquivo)
+
+        sess.execute(
+            uploads.update()
+            .where(uploads.c.id == batch_id)
+            .values(num_registros=total)
+        )
+        update_rollups(sess, batch_id)
+        bump_warehouse_version(sess)
+        sess.commit()
+    except Exception:
+        sess.rollback()
+        raise
+    finally:
+        sess.close()
+    return batch_id
+
+def _as_list(values):
+    if values is None:
+        return []
+    return [values] if isinstance(values, str) else list(values)
+
+def query_vendas_stmt(batch_ids=None, origem_arquivo=None, columns=None):
+    """SELECT de `query_vendas` (sem executar)."""
+    batch_ids, nomes = _as_list(batch_ids), _as_list(origem_arquivo)
+    if not batch_ids and not nomes:
+        raise ValueError("Informe batch_ids e/ou origem_arquivo")
+    if columns:
+        missing = [c for c in columns if c not in vendas.c]
+        if missing:
+            raise KeyError(f"Colunas inexistentes em vendas: {missing}")
+        stmt = select(*[vendas.c[c] for c in columns])
+    else:
+        stmt = select(vendas)
+
+    lotes = []
+    if batch_ids:
+        lotes.append(vendas.c.batch_id.in_(batch_ids))
+    if nomes:
+        lotes.append(vendas.c.batch_id.in_(
+            select(uploads.c.id).where(uploads.c.origem_arquivo.in_(nomes))
+        ))
+    return stmt.where(or_(*lotes))
+
+def query_vendas(batch_ids=None, origem_arquivo=None, columns=None):
+    """
+    Vendas de um ou mais lotes numa única consulta.
+
+    `batch_ids` filtra direto por batch_id; `origem_arquivo` (um nome ou uma
+    lista) pega todos os uploads com esses nomes por uma subconsulta em
+    uploads, sem ida e volta extra. `columns` limita as colunas lidas
+    (padrão: todas as da visão vendas). No PostgreSQL a leitura usa COPY.
+    """
+    from data.streaming import read_frame
+    stmt = query_vendas_stmt(batch_ids, origem_arquivo, columns)
+    with Session() as sess:
+        return read_frame(stmt, sess)
+
+def query_vendas_by_batch(batch_id, columns=None):
+    """Retorna DataFrame de todas as vendas desse lote (ou lotes)."""
+    return query_vendas(batch_ids=batch_id, columns=columns)
+
+def query_vendas_by_name(origem_arquivo, columns=None):
+    """Vendas de todos os uploads com esse nome de arquivo (vazio se não houver)."""
+    return query_vendas(origem_arquivo=origem_arquivo, columns=columns)
+
+UPLOADS_PAGE_SIZE = 50
+
+def list_uploads(prefix=None, after=None, limit=UPLOADS_PAGE_SIZE):
+    """
+    Uma página de uploads, do mais recente para o mais antigo.
+
+    `after` é o cursor (data_upload, id) da última linha da página anterior:
+    cada página é uma busca no índice, sem OFFSET. `prefix` filtra pelo
+    começo de origem_arquivo, sem diferenciar maiúsculas.
+    """
+    stmt = select(uploads.c.id, uploads.c.origem_arquivo, uploads.c.data_upload,
+                  uploads.c.num_registros)
+    if prefix:
+        escaped = prefix.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        stmt = stmt.where(func.lower(uploads.c.origem_arquivo).like(f"{escaped}%", escape='\\'))
+    if after is not None:
+        stmt = stmt.where(tuple_(uploads.c.data_upload, uploads.c.id) < tuple_(*after))
+    stmt = stmt.order_by(uploads.c.data_upload.desc(), uploads.c.id.desc()).limit(limit)
+    with get_engine().connect() as conn:
+        return [tuple(row) for row in conn.execute(stmt)]
+
+def recent_uploads(limit=UPLOADS_PAGE_SIZE):
+    """Primeira página de list_uploads, em memória até o próximo lote gravado."""
+    from data.querycache import query_cache
+    return query_cache.get_or_compute(list_uploads, (), {'limit': limit})
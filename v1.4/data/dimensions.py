@@ -0,0 +1,171 @@
+"""
+Resolução das chaves substitutas do esquema estrela e a visão `vendas`.
+
+Na ingestão, cada bloco troca vendedor, consorciado e bem pelos ids das
+dimensões: os valores distintos do bloco são procurados em lotes, os que
+faltam são inseridos de uma vez (ON CONFLICT DO NOTHING quando o dialeto
+suporta) e o resultado volta para as linhas pelos códigos do factorize.
+As chaves já vistas ficam em `sess.info`, então os blocos seguintes da
+mesma sessão só consultam valores novos.
+"""
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, insert, select
+
+from data.db import (dim_bem, dim_consorciado, dim_data, dim_vendedor, uploads, vendas,
+                     vendas_fato)
+
+LOOKUP_BATCH = 1000
+
+
+def _dialect_insert(sess, table):
+    dialect = sess.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(table).on_conflict_do_nothing()
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(table).on_conflict_do_nothing()
+    return insert(table)
+
+
+def _lookup(sess, dim, key_cols: List[str], keys: list, cache: Dict) -> None:
+    """
+    Preenche `cache` com {chave natural: id} para as chaves que já existem.
+
+    A busca usa só a primeira coluna da chave (IN com valores simples, que
+    usa o índice único) e as tuplas completas são conferidas em Python.
+    """
+    columns = [dim.c[c] for c in key_cols]
+    wanted = set(keys)
+    firsts = list(dict.fromkeys(k[0] for k in keys))
+    for i in range(0, len(firsts), LOOKUP_BATCH):
+        part = firsts[i:i + LOOKUP_BATCH]
+        for row in sess.execute(select(dim.c.id, *columns).where(columns[0].in_(part))):
+            key = tuple(row[1:])
+            if key in wanted:
+                cache[key] = row[0]
+
+
+def resolve_keys(sess, dim, key_cols: List[str], values: pd.Series) -> np.ndarray:
+    """
+    Ids da dimensão para cada linha (None onde o valor é nulo), inserindo
+    as chaves naturais que ainda não existem.
+
+    `values` traz uma tupla por linha na ordem de `key_cols` (ou None).
+    """
+    cache = sess.info.setdefault('dim_keys', {}).setdefault(dim.name, {})
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    uniques = list(uniques)
+
+    missing = [k for k in uniques if k not in cache]
+    if missing:
+        _lookup(sess, dim, key_cols, missing, cache)
+        new = [k for k in missing if k not in cache]
+        if new:
+            sess.execute(_dialect_insert(sess, dim), [dict(zip(key_cols, k)) for k in new])
+            _lookup(sess, dim, key_cols, new, cache)
+
+    ids = np.array([cache[k] for k in uniques] + [None], dtype=object)
+    return ids[codes]
+
+
+def _as_text(value) -> str:
+    # 5001.0 (célula numérica do Excel) vira '5001', como no CSV
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _key_tuples(records: pd.DataFrame, columns: List[str], fill_partial: bool = False) -> pd.Series:
+    """
+    Uma tupla por linha; None se todas as colunas forem nulas.
+
+    As partes viram texto, como nas colunas String das dimensões: senão uma
+    chave numérica (ex.: BEM 5001 vindo do xlsx) não bate com o '5001' que
+    `_lookup` lê do banco.
+    """
+    parts = [records[c].astype(object).map(_as_text, na_action='ignore')
+             if c in records.columns else pd.Series(None, index=records.index, dtype=object)
+             for c in columns]
+    empty = pd.concat([p.isna() for p in parts], axis=1).all(axis=1).to_numpy()
+    if fill_partial:
+        parts = [p.where(p.notna(), '') for p in parts]
+    tuples = pd.Series(list(zip(*[p.astype(object) for p in parts])), index=records.index,
+                       dtype=object)
+    tuples[empty] = None
+    return tuples
+
+
+def resolve_date_keys(sess, dates: pd.Series) -> np.ndarray:
+    """Chave AAAAMMDD de cada data, garantindo a linha em dim_data."""
+    dates = pd.to_datetime(dates, errors='coerce')
+    keys = dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day
+    known = sess.info.setdefault('dim_keys', {}).setdefault(dim_data.name, {})
+
+    uniques = [int(k) for k in keys.dropna().unique() if int(k) not in known]
+    if uniques:
+        for i in range(0, len(uniques), LOOKUP_BATCH):
+            part = uniques[i:i + LOOKUP_BATCH]
+            known.update((k, k) for k in sess.execute(
+                select(dim_data.c.id).where(dim_data.c.id.in_(part))).scalars())
+        new = [k for k in uniques if k not in known]
+        if new:
+            sess.execute(_dialect_insert(sess, dim_data), [
+                {'id': k, 'data': pd.Timestamp(k // 10000, k // 100 % 100, k % 100).date(),
+                 'ano': k // 10000, 'mes': k // 100 % 100, 'dia': k % 100,
+                 'trimestre': (k // 100 % 100 - 1) // 3 + 1}
+                for k in new
+            ])
+            known.update((k, k) for k in new)
+
+    return keys.astype('Int64').astype(object).where(keys.notna(), None).to_numpy()
+
+
+def to_fact_rows(sess, records: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte linhas no formato da visão `vendas` (textos) para o formato de
+    vendas_fato (chaves inteiras). Colunas extras (ex.: chunk_no) são mantidas.
+    """
+    fact = records.drop(columns=['vendedor', 'consorciado', 'nome_consorciado', 'bem',
+                                 'origem_arquivo', 'data_upload'], errors='ignore')
+    if records.empty:
+        return fact.assign(vendedor_id=None, consorciado_id=None, bem_id=None,
+                           data_venda_id=None)
+    fact['vendedor_id'] = resolve_keys(sess, dim_vendedor, ['nome'],
+                                       _key_tuples(records, ['vendedor']))
+    fact['consorciado_id'] = resolve_keys(
+        sess, dim_consorciado, ['consorciado', 'nome_consorciado'],
+        _key_tuples(records, ['consorciado', 'nome_consorciado'], fill_partial=True)
+    )
+    fact['bem_id'] = resolve_keys(sess, dim_bem, ['bem'], _key_tuples(records, ['bem']))
+    fact['data_venda_id'] = resolve_date_keys(sess, records['data_venda'])
+    return fact
+
+
+def vendas_view_select():
+    """SELECT da visão `vendas`: vendas_fato + dimensões + uploads, com as colunas antigas."""
+    f = vendas_fato
+    expressions = {
+        'data_upload': uploads.c.data_upload,
+        'origem_arquivo': uploads.c.origem_arquivo,
+        'vendedor': dim_vendedor.c.nome,
+        'consorciado': func.nullif(dim_consorciado.c.consorciado, ''),
+        'nome_consorciado': func.nullif(dim_consorciado.c.nome_consorciado, ''),
+        'bem': dim_bem.c.bem,
+    }
+    columns = [expressions[c.name].label(c.name) if c.name in expressions else f.c[c.name]
+               for c in vendas.columns]
+    return select(*columns).select_from(
+        f.outerjoin(uploads, uploads.c.id == f.c.batch_id)
+        .outerjoin(dim_vendedor, dim_vendedor.c.id == f.c.vendedor_id)
+        .outerjoin(dim_consorciado, dim_consorciado.c.id == f.c.consorciado_id)
+        .outerjoin(dim_bem, dim_bem.c.id == f.c.bem_id)
+    )
+
+
+def create_vendas_view(conn) -> None:
+    sql = vendas_view_select().compile(conn, compile_kwargs={'literal_binds': True})
+    conn.exec_driver_sql(f"CREATE VIEW vendas AS {sql}")
@@ -33,7 +33,7 @@ class ExportFile:
                 date_fmt = workbook.add_format({'num_format': 'dd/mm/yyyy'})
 
                 row = 0
-                for cons, group in df_export.groupby('CONSORCIADO'):
+                for cons, group in df_export.groupby('CONSORCIADO', observed=True):
                     data_info = ''
                     if 'DATA VENDA' in group.columns:
                         datas = group['DATA VENDA'].dropna()
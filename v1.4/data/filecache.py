@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import sys
+from typing import Callable
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (necessário para to_parquet/read_parquet)
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+class FileCache:
+    """
+    Cache em disco dos DataFrames já tratados pelos loaders.
+
+    A chave é o hash do conteúdo do arquivo + o loader e a sua versão, então
+    renomear ou mover o arquivo não invalida o cache, mas qualquer alteração
+    no conteúdo ou no tratamento sim. Os frames são gravados em Parquet e os
+    mais antigos (pelo último acesso) são descartados quando o diretório passa
+    de `max_bytes`.
+
+    O `attrs` do frame (ex.: contagem de linhas rejeitadas) vai num JSON ao
+    lado do Parquet e volta no hit.
+
+    O limite vale também para o subdiretório com as páginas de PDF
+    (`pdf_pages/`, JSON). O cache de consultas (`consultas/`, pickle) tem
+    limite próprio e fica de fora.
+    """
+    DEFAULT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'datawarehouse-system')
+    DEFAULT_MAX_MB = 2048
+    HASH_BLOCK = 4 * 1024 * 1024
+    # Arquivos contados no limite (os .tmp em escrita e os .pkl não entram)
+    ENTRY_EXTENSIONS = ('.parquet', '.json')
+    ATTRS_SUFFIX = '.attrs.json'
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        self.cache_dir = cache_dir or os.getenv("DW_CACHE_DIR", self.DEFAULT_DIR)
+        if max_bytes is None:
+            max_bytes = int(os.getenv("DW_CACHE_MAX_MB", self.DEFAULT_MAX_MB)) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.enabled = HAS_PYARROW and os.getenv("DW_CACHE_DISABLED", "") == ""
+
+    @classmethod
+    def file_hash(cls, file_path: str) -> str:
+        h = hashlib.blake2b(digest_size=20)
+        with open(file_path, 'rb') as f:
+            while block := f.read(cls.HASH_BLOCK):
+                h.update(block)
+        return h.hexdigest()
+
+    def _entry_path(self, file_path: str, loader: Callable, version: str) -> str:
+        key = f"{self.file_hash(file_path)}-{loader.__qualname__}-{version}"
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def load(self, file_path: str, loader: Callable[[str], pd.DataFrame],
+             version: str) -> pd.DataFrame:
+        """Retorna o frame do cache ou chama `loader(file_path)` e grava o resultado."""
+        if not self.enabled:
+            return loader(file_path)
+
+        entry = self._entry_path(file_path, loader, version)
+        if os.path.exists(entry):
+            try:
+                df = pd.read_parquet(entry)
+                df.attrs = self._load_attrs(entry)
+                os.utime(entry)  # marca como usado recentemente
+                print(f"DEBUG: Cache hit para {os.path.basename(file_path)}")
+                return df
+            except Exception as e:
+                print(f"DEBUG: Entrada de cache inválida ({e}), recarregando")
+                self._remove(entry)
+
+        df = loader(file_path)
+        self._store(entry, df)
+        return df
+
+    def _store(self, entry: str, df: pd.DataFrame) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{entry}.{os.getpid()}.tmp"
+        try:
+            # attrs não é serializável em Parquet de forma confiável
+            df.copy(deep=False).pipe(_without_attrs).to_parquet(tmp, index=True)
+            self._store_attrs(entry, df.attrs)
+            os.replace(tmp, entry)
+        except Exception as e:
+            print(f"DEBUG: Não foi possível gravar no cache: {e}")
+            self._remove(tmp)
+            return
+        self.evict()
+
+    def _store_attrs(self, entry: str, attrs: dict) -> None:
+        path = entry + self.ATTRS_SUFFIX
+        if not attrs:
+            self._remove(path)
+            return
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(attrs, f, ensure_ascii=False, default=str)
+        os.replace(tmp, path)
+
+    def _load_attrs(self, entry: str) -> dict:
+        try:
+            with open(entry + self.ATTRS_SUFFIX, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                # O attrs de uma entrada sai junto com o Parquet (_remove_entry)
+                if name.endswith(self.ENTRY_EXTENSIONS) and not name.endswith(self.ATTRS_SUFFIX):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _prune_dirs(self) -> None:
+        """Remove os subdiretórios que ficaram vazios (ex.: páginas de um PDF)."""
+        for root, _, _ in os.walk(self.cache_dir, topdown=False):
+            if root != self.cache_dir:
+                try:
+                    os.rmdir(root)
+                except OSError:
+                    pass
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> None:
+        """Remove as entradas menos usadas até o cache caber em `max_bytes`."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove_entry(path)
+            total -= size
+            removed += 1
+        if removed:
+            self._prune_dirs()
+
+    def clear(self) -> int:
+        """Apaga todas as entradas do cache e retorna quantas foram removidas."""
+        entries = self._entries()
+        for _, _, path in entries:
+            self._remove_entry(path)
+        self._prune_dirs()
+        return len(entries)
+
+    def _remove_entry(self, path: str) -> None:
+        self._remove(path)
+        if path.endswith('.parquet'):
+            self._remove(path + self.ATTRS_SUFFIX)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _without_attrs(df: pd.DataFrame) -> pd.DataFrame:
+    df.attrs = {}
+    return df
+
+
+file_cache = FileCache()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'clear':
+        print(f"{file_cache.clear()} entrada(s) removida(s) de {file_cache.cache_dir}")
+    else:
+        print(f"Cache: {file_cache.cache_dir}")
+        print(f"Entradas: {len(file_cache._entries())}  "
+              f"Tamanho: {file_cache.size() / 1024 ** 2:.1f} MB de "
+              f"{file_cache.max_bytes / 1024 ** 2:.0f} MB")
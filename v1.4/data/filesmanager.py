@@ -1,10 +1,19 @@
+import os
+import pandas as pd
 from tkinter import ttk, filedialog, messagebox
 from backend.dataloader_db import DataLoader_db
 from backend.dataload_local import DataLoader_local
 from data.db import insert_upload_and_vendas, Session, uploads, query_vendas_by_batch
+from data.filecache import file_cache
+from data.bulk_import import bulk_import, format_summary
+from data.staging import upload_file_resumable
 
 
 class FileManager:
+    # Acima deste tamanho o upload para o banco é feito em blocos, sem
+    # manter o arquivo inteiro em memória.
+    STREAM_THRESHOLD_BYTES = 50 * 1024 * 1024
+
     def load_file(self):
         path = filedialog.askopenfilename(
             filetypes=[("Arquivos Suportados", "*.csv *.xls *.xlsx *.pdf")]
@@ -13,8 +22,18 @@ class FileManager:
             return
 
         try:
-            df = DataLoader_db.load_db(path) if self.functionExport == "Banco de dados" else DataLoader_local.load_local(path)
-            batch_id = insert_upload_and_vendas(df, path) if self.functionExport == "Banco de dados" else None
+            if self.functionExport == "Banco de dados" and os.path.getsize(path) > self.STREAM_THRESHOLD_BYTES:
+                # Arquivo grande: lê, trata e envia em blocos com checkpoint (se a
+                # conexão cair, escolher o mesmo arquivo retoma de onde parou);
+                # os filtros passam a consultar o banco.
+                batch_id = upload_file_resumable(path)
+                df = pd.DataFrame()
+            else:
+                if self.functionExport == "Banco de dados":
+                    df = file_cache.load(path, DataLoader_db.load_db, DataLoader_db.LOADER_VERSION)
+                else:
+                    df = file_cache.load(path, DataLoader_local.load_local, DataLoader_local.LOADER_VERSION)
+                batch_id = insert_upload_and_vendas(df, path) if self.functionExport == "Banco de dados" else None
             self.df = df
             self.current_batch_id = batch_id if self.functionExport == "Banco de dados" else None
             self.numeric_columns = df.select_dtypes(include=['number']).columns.tolist()
@@ -31,10 +50,42 @@ class FileManager:
             ]:
                 btn.grid()
 
-            messagebox.showinfo("Sucesso", "Arquivo carregado com sucesso!")
+            message = "Arquivo carregado com sucesso!"
+            if df.attrs.get('rejected_report'):
+                count, report = df.attrs['rejected_report']
+                message += f"\n\n{count} linha(s) rejeitada(s); relatório em:\n{report}"
+            messagebox.showinfo("Sucesso", message)
         except Exception as e:
             messagebox.showerror("Erro", f"Falha ao carregar arquivo:\n{e}")
 
+    def load_many_files(self):
+        paths = filedialog.askopenfilenames(
+            filetypes=[("Arquivos Suportados", "*.csv *.xls *.xlsx *.pdf")]
+        )
+        if paths:
+            self._bulk_import(list(paths))
+
+    def load_folder(self):
+        folder = filedialog.askdirectory(title="Selecione a pasta com os arquivos")
+        if folder:
+            self._bulk_import([folder])
+
+    def _bulk_import(self, paths):
+        """Importa cada arquivo como um lote próprio e mostra o resumo por arquivo."""
+        try:
+            results = bulk_import(paths)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Falha na importação:\n{e}")
+            return
+        if not results:
+            messagebox.showwarning("Atenção", "Nenhum arquivo suportado encontrado.")
+            return
+        self.file_var.set(f"{len(results)} arquivo(s) importado(s)")
+        if any(r['status'] == 'erro' for r in results):
+            messagebox.showwarning("Importação concluída com erros", format_summary(results))
+        else:
+            messagebox.showinfo("Importação concluída", format_summary(results))
+
     # def load_values(self, event=None):
     #     col = self.combo_columns.get()
     #     if col and hasattr(self, 'df') and not self.df.empty:
@@ -0,0 +1,266 @@
+"""
+Migrações leves do banco, aplicadas por `init_db()`.
+
+Cada migração tem uma versão e uma função que recebe uma conexão em
+autocommit; as versões aplicadas ficam em `schema_migrations`. No
+PostgreSQL os índices são criados com CREATE INDEX CONCURRENTLY (sem
+bloquear escritas em vendas), o que exige estar fora de uma transação.
+
+Benchmark dos planos de consulta antes/depois dos índices:
+    python -m data.migrations benchmark [linhas]
+"""
+import os
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import (Column, DateTime, MetaData, String, Table, func,
+                        inspect, select, text)
+from sqlalchemy.schema import CreateIndex
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.db import (FATO_INDEXES, UPLOADS_INDEXES, get_engine, uploads, vendas, vendas_fato,
+                     year_range)
+from data.partitioning import is_partitioned
+
+migrations_metadata = MetaData()
+
+schema_migrations = Table(
+    'schema_migrations', migrations_metadata,
+    Column('versao', String, primary_key=True),
+    Column('descricao', String),
+    Column('aplicada_em', DateTime, default=datetime.utcnow),
+)
+
+def _invalid_index(conn, name):
+    """Índice que sobrou de um CREATE INDEX CONCURRENTLY interrompido (PostgreSQL)."""
+    return conn.execute(text(
+        "SELECT NOT i.indisvalid FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+    ), {'name': name}).scalar()
+
+
+def create_index(conn, index):
+    """
+    Cria o índice se ainda não existir (CONCURRENTLY no PostgreSQL, exceto
+    em tabelas particionadas, que não suportam).
+    """
+    # IF NOT EXISTS em vez de checkfirst: a reflexão não enxerga índices de expressão
+    ddl = CreateIndex(index, if_not_exists=True)
+    if conn.dialect.name == 'postgresql':
+        if _invalid_index(conn, index.name):
+            print(f"DEBUG: Índice {index.name} inválido, recriando")
+            conn.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"')
+        if not is_partitioned(conn, index.table.name):
+            # CONCURRENTLY só no texto deste comando: o Index do módulo é o
+            # mesmo do metadata, e marcá-lo faria o create_all (em transação)
+            # emitir CONCURRENTLY também
+            sql = str(ddl.compile(dialect=conn.dialect, compile_kwargs={'literal_binds': True}))
+            conn.exec_driver_sql(sql.replace('INDEX ', 'INDEX CONCURRENTLY ', 1))
+            return
+    conn.execute(ddl)
+
+
+def drop_index(conn, index):
+    if conn.dialect.name == 'postgresql':
+        conn.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"')
+    else:
+        conn.exec_driver_sql(f'DROP INDEX IF EXISTS "{index.name}"')
+
+
+def _has_base_table(conn, name):
+    """Tabela física (visões não contam)."""
+    return name in inspect(conn).get_table_names()
+
+
+def _m001_indices_uploads(conn):
+    for index in UPLOADS_INDEXES:
+        create_index(conn, index)
+
+
+def _m002_esquema_estrela(conn):
+    """
+    Passa para o esquema estrela: se vendas ainda é tabela, as linhas são
+    copiadas para vendas_fato em blocos (resolvendo as chaves das dimensões
+    pelo mesmo caminho da ingestão) e a tabela é trocada pela visão vendas,
+    tudo numa transação só.
+    """
+    from data.db import Session, _write_fact_rows
+    from data.dimensions import create_vendas_view, to_fact_rows
+
+    with conn.engine.begin() as tx:
+        if _has_base_table(tx, 'vendas'):
+            sess = Session(bind=tx)
+            last_id, copied = 0, 0
+            while True:
+                rows = tx.execute(
+                    select(vendas).where(vendas.c.id > last_id)
+                    .order_by(vendas.c.id).limit(MIGRATION_BATCH)
+                ).mappings().all()
+                if not rows:
+                    break
+                last_id = rows[-1]['id']
+                records = pd.DataFrame(rows).astype(object)
+                records = records.where(pd.notnull(records), None).drop(columns='id')
+                _write_fact_rows(sess, to_fact_rows(sess, records))
+                copied += len(records)
+            print(f"DEBUG: {copied} linha(s) de vendas copiadas para vendas_fato")
+            tx.exec_driver_sql("DROP TABLE vendas")
+        # O staging antigo tinha as colunas largas; lotes em andamento recomeçam
+        if _has_base_table(tx, 'vendas_staging'):
+            tx.exec_driver_sql("DROP TABLE vendas_staging")
+            tx.exec_driver_sql("DELETE FROM upload_checkpoints WHERE status = 'staging'")
+        create_vendas_view(tx)
+
+    for index in FATO_INDEXES:
+        create_index(conn, index)
+
+
+def _m003_resumos(conn):
+    # Tabelas criadas pelo create_all; aqui só o preenchimento com o histórico
+    from data.rollups import rebuild_rollups
+    with conn.engine.begin() as tx:
+        rebuild_rollups(tx)
+
+
+def _m004_versao_dw(conn):
+    # Tabela criada pelo create_all; a linha já existir evita o INSERT
+    # concorrente no primeiro lote gravado
+    from data.db import versao_dw
+    if conn.execute(select(versao_dw.c.id).where(versao_dw.c.id == 1)).first() is None:
+        conn.execute(versao_dw.insert().values(id=1, versao=0))
+
+
+# (versão, descrição, função); novas migrações entram no fim da lista
+MIGRATIONS = [
+    ('001', 'índices de uploads (nome, listagem paginada e busca por prefixo)',
+     _m001_indices_uploads),
+    ('002', 'esquema estrela: vendas_fato + dimensões + visão vendas', _m002_esquema_estrela),
+    ('003', 'resumos por lote e por mês a partir do histórico', _m003_resumos),
+    ('004', 'versão do armazém para o cache de consultas', _m004_versao_dw),
+]
+
+MIGRATION_BATCH = 50_000
+
+
+def applied_versions(engine=None):
+    engine = engine or get_engine()
+    schema_migrations.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        return set(conn.execute(select(schema_migrations.c.versao)).scalars())
+
+
+def run_migrations(engine=None):
+    """Aplica as migrações pendentes, em ordem. Retorna as versões aplicadas agora."""
+    engine = engine or get_engine()
+    done = applied_versions(engine)
+    applied = []
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        for versao, descricao, migrate in MIGRATIONS:
+            if versao in done:
+                continue
+            print(f"DEBUG: Aplicando migração {versao}: {descricao}")
+            start = time.perf_counter()
+            migrate(conn)
+            conn.execute(schema_migrations.insert().values(versao=versao, descricao=descricao))
+            print(f"DEBUG: Migração {versao} aplicada em {time.perf_counter() - start:.2f}s")
+            applied.append(versao)
+    return applied
+
+
+def benchmark_queries():
+    """As consultas de db_filters/db que os índices devem atender."""
+    from data.db import dim_consorciado, dim_vendedor
+    por_vendedor = (
+        select(vendas_fato.c.vendedor_id, func.sum(vendas_fato.c.liquido_reais).label('total'))
+        .where(vendas_fato.c.vendedor_id != None)
+        .group_by(vendas_fato.c.vendedor_id)
+        .subquery()
+    )
+    return {
+        'filter_status_atraso_db': select(vendas).where(vendas.c.status_cota != 'A'),
+        'filter_by_year_db': select(vendas).where(year_range(vendas.c.data_venda, 2024)),
+        'total_liquido_por_vendedor_db': (
+            select(dim_vendedor.c.nome, por_vendedor.c.total)
+            .join_from(por_vendedor, dim_vendedor, dim_vendedor.c.id == por_vendedor.c.vendedor_id)
+        ),
+        'relatorio_por_consorciado_db': (
+            select(vendas.c.data_venda, vendas.c.vendedor, vendas.c.liquido_reais)
+            .where(vendas.c.nome_consorciado == 'CONSORCIADO 42')
+        ),
+        'query_vendas_by_name': select(uploads.c.id).where(uploads.c.origem_arquivo == 'arquivo_7.csv'),
+    }
+
+
+def explain(conn, stmt):
+    """Plano da consulta: EXPLAIN ANALYZE no PostgreSQL, EXPLAIN QUERY PLAN no SQLite."""
+    sql = str(stmt.compile(conn, compile_kwargs={'literal_binds': True}))
+    if conn.dialect.name == 'postgresql':
+        rows = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, COSTS OFF) {sql}").scalars().all()
+    else:
+        rows = [r[-1] for r in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()]
+    return "\n".join(f"      {r}" for r in rows)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != 'benchmark':
+        print(f"Migrações aplicadas agora: {run_migrations() or 'nenhuma'}")
+        sys.exit(0)
+
+    # Benchmark em um SQLite temporário, ou no banco de BENCH_DATABASE_URL
+    # (um PostgreSQL de testes: as vendas e uploads são apagados!).
+    # Gera vendas sintéticas e compara os planos sem/com os índices de vendas_fato.
+    import tempfile
+    import numpy as np
+    from data.db import Session, _insert_vendas_chunk, configure_engine, init_db
+
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    url = (os.getenv("BENCH_DATABASE_URL")
+           or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    engine = configure_engine(url)
+    init_db()
+
+    rng = np.random.default_rng(0)
+    with Session() as sess:
+        sess.execute(vendas_fato.delete())
+        sess.execute(uploads.delete())
+        sess.execute(uploads.insert(), [
+            {'id': f"lote-{i}", 'origem_arquivo': f"arquivo_{i}.csv", 'num_registros': 0}
+            for i in range(2_000)
+        ])
+        df = pd.DataFrame({
+            'data_venda': pd.Timestamp('2018-01-01')
+            + pd.to_timedelta(rng.integers(0, 8 * 365, n), unit='D'),
+            'status_cota': np.where(rng.random(n) < 0.03, 'I', 'A'),
+            'vendedor': [f"VENDEDOR {v}" for v in rng.integers(0, 300, n)],
+            'nome_consorciado': [f"CONSORCIADO {v}" for v in rng.integers(0, 40_000, n)],
+            'liquido_reais': rng.random(n).round(2) * 1000,
+        }).astype(object)
+        batches = rng.integers(0, 2_000, n)
+        for b in range(0, 2_000, 100):
+            part = df[(batches >= b) & (batches < b + 100)].copy()
+            _insert_vendas_chunk(sess, part, f"lote-{b}")
+        sess.commit()
+
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        for index in FATO_INDEXES + UPLOADS_INDEXES:
+            drop_index(conn, index)
+        conn.exec_driver_sql("ANALYZE")
+        before = {name: explain(conn, stmt) for name, stmt in benchmark_queries().items()}
+        start = time.perf_counter()
+        for index in FATO_INDEXES + UPLOADS_INDEXES:
+            create_index(conn, index)
+        print(f"Criação dos índices: {time.perf_counter() - start:.2f}s ({n} linhas)")
+        conn.exec_driver_sql("ANALYZE")
+
+        for name, stmt in benchmark_queries().items():
+            times = []
+            for _ in range(3):
+                t = time.perf_counter()
+                conn.execute(stmt).all()
+                times.append(time.perf_counter() - t)
+            print(f"\n== {name} ({min(times) * 1000:.1f} ms com índices)")
+            print(f"   antes:\n{before[name]}")
+            print(f"   depois:\n{explain(conn, stmt)}")
@@ -0,0 +1,238 @@
+"""
+Layout opcional (só PostgreSQL) com a tabela fato vendas_fato particionada
+por mês de data_venda.
+
+Com VENDAS_PARTITIONED=1, `init_db()` cria vendas_fato como tabela particionada
+(PARTITION BY RANGE (data_venda)) com uma partição por mês e uma partição
+DEFAULT para datas nulas ou meses ainda sem partição. Os filtros por ano e
+por intervalo de datas usam predicados de intervalo (data_venda >= início
+AND data_venda < fim), então o planejador só lê as partições do período.
+
+Manutenção (rodar, por exemplo, todo mês num agendador):
+    python -m data.partitioning criar --meses 3       # partições futuras
+    python -m data.partitioning criar --desde 2019-01 # também o histórico
+    python -m data.partitioning converter             # vendas_fato atual -> particionada
+    python -m data.partitioning status
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+from sqlalchemy import Column, Integer, MetaData, Table, text
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.db import get_engine, vendas_fato
+
+PARTITIONED = os.getenv("VENDAS_PARTITIONED", "0") in ("1", "true", "True")
+MONTHS_AHEAD = int(os.getenv("VENDAS_PARTITION_MONTHS_AHEAD", "3"))
+FACT_TABLE = vendas_fato.name
+DEFAULT_PARTITION = f'{FACT_TABLE}_default'
+
+
+def _partitioned_table_ddl(dialect, name=FACT_TABLE):
+    """
+    DDL de vendas_fato como tabela particionada.
+
+    Tabelas particionadas exigem que a chave primária contenha a chave de
+    partição, e data_venda pode ser nula; por isso id vira um inteiro com
+    sequência (sem PRIMARY KEY) e a unicidade fica a cargo da sequência.
+    """
+    layout = Table(
+        name, MetaData(),
+        Column('id', Integer, server_default=text(f"nextval('{FACT_TABLE}_id_seq')")),
+        *[Column(c.name, c.type) for c in vendas_fato.columns if c.name != 'id'],
+        postgresql_partition_by='RANGE (data_venda)',
+    )
+    return str(CreateTable(layout).compile(dialect=dialect))
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{FACT_TABLE}_p{month:%Y_%m}"
+
+
+def is_partitioned(conn, table_name: str = FACT_TABLE) -> bool:
+    """Se a tabela (padrão: vendas_fato) é particionada; sempre False fora do PostgreSQL."""
+    if conn.dialect.name != 'postgresql':
+        return False
+    return conn.execute(text(
+        "SELECT relkind = 'p' FROM pg_class WHERE relname = :name "
+        "AND relnamespace = current_schema()::regnamespace"
+    ), {'name': table_name}).scalar() or False
+
+
+def existing_partitions(conn):
+    """Nomes das partições de vendas_fato (inclui a DEFAULT)."""
+    return set(conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :name"
+    ), {'name': FACT_TABLE}).scalars())
+
+
+def create_partitioned_vendas(conn):
+    """Cria vendas_fato particionada + partição DEFAULT (a tabela não pode existir)."""
+    conn.exec_driver_sql(f"CREATE SEQUENCE IF NOT EXISTS {FACT_TABLE}_id_seq")
+    conn.exec_driver_sql(_partitioned_table_ddl(conn.dialect))
+    conn.exec_driver_sql(f"ALTER SEQUENCE {FACT_TABLE}_id_seq OWNED BY {FACT_TABLE}.id")
+    conn.exec_driver_sql(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {FACT_TABLE} DEFAULT")
+    # Índices no pai valem para todas as partições (atuais e futuras)
+    for index in vendas_fato.indexes:
+        conn.execute(CreateIndex(index, if_not_exists=True))
+    print(f"DEBUG: Tabela {FACT_TABLE} particionada por mês criada")
+
+
+def create_month_partition(conn, month: date) -> bool:
+    """
+    Cria a partição do mês, se ainda não existir. Linhas do mês que caíram
+    na partição DEFAULT são movidas para a nova partição (senão o ATTACH
+    falha). Retorna True se a partição foi criada.
+    """
+    name = partition_name(month)
+    if name in existing_partitions(conn):
+        return False
+    start, end = month_start(month), add_months(month, 1)
+    bounds = {'inicio': start, 'fim': end}
+    conn.exec_driver_sql(
+        f"CREATE TABLE {name} (LIKE {FACT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    moved = conn.execute(text(
+        f"WITH movidas AS (DELETE FROM {DEFAULT_PARTITION} "
+        f"WHERE data_venda >= :inicio AND data_venda < :fim RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM movidas"
+    ), bounds).rowcount
+    # A constraint evita que o ATTACH precise varrer a tabela para validar
+    conn.exec_driver_sql(
+        f"ALTER TABLE {name} ADD CONSTRAINT {name}_faixa "
+        f"CHECK (data_venda IS NOT NULL AND data_venda >= '{start}' AND data_venda < '{end}')"
+    )
+    conn.exec_driver_sql(
+        f"ALTER TABLE {FACT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    )
+    conn.exec_driver_sql(f"ALTER TABLE {name} DROP CONSTRAINT {name}_faixa")
+    print(f"DEBUG: Partição {name} criada ({moved} linha(s) vindas da DEFAULT)")
+    return True
+
+
+def ensure_partitions(conn, months_ahead: int = MONTHS_AHEAD, since: date = None) -> list:
+    """Garante uma partição por mês de `since` (ou do mês atual) até months_ahead à frente."""
+    current = month_start(since or date.today())
+    last = add_months(month_start(date.today()), months_ahead)
+    created = []
+    while current <= last:
+        if create_month_partition(conn, current):
+            created.append(partition_name(current))
+        current = add_months(current, 1)
+    return created
+
+
+def init_partitioned(engine=None):
+    """Chamado por init_db() com VENDAS_PARTITIONED=1: cria o layout se vendas_fato não existir."""
+    engine = engine or get_engine()
+    if engine.dialect.name != 'postgresql':
+        print("DEBUG: Particionamento só é suportado no PostgreSQL; usando a tabela simples")
+        return False
+    with engine.begin() as conn:
+        exists = conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"),
+                              {'name': FACT_TABLE}).scalar()
+        if not exists:
+            create_partitioned_vendas(conn)
+        if is_partitioned(conn):
+            ensure_partitions(conn)
+            return True
+    return False
+
+
+def convert_to_partitioned(engine=None):
+    """
+    Converte a vendas_fato existente para o layout particionado, numa única
+    transação: renomeia a atual, cria a particionada com partições do
+    primeiro mês com dados até MONTHS_AHEAD à frente, copia as linhas e
+    recria a visão vendas (que dependia da tabela antiga).
+    """
+    from data.dimensions import create_vendas_view
+
+    engine = engine or get_engine()
+    legacy = f"{FACT_TABLE}_legado"
+    with engine.begin() as conn:
+        if is_partitioned(conn):
+            print(f"DEBUG: {FACT_TABLE} já é particionada")
+            return
+        first = conn.execute(text(f"SELECT min(data_venda) FROM {FACT_TABLE}")).scalar()
+        conn.exec_driver_sql("DROP VIEW IF EXISTS vendas")
+        conn.exec_driver_sql(f"ALTER TABLE {FACT_TABLE} RENAME TO {legacy}")
+        # A sequência serial da tabela antiga continua numerando os ids
+        conn.exec_driver_sql(f"ALTER SEQUENCE IF EXISTS {FACT_TABLE}_id_seq OWNED BY NONE")
+        # Índices da tabela antiga liberam os nomes para a tabela nova
+        for name in conn.execute(text(
+            "SELECT indexname FROM pg_indexes WHERE tablename = :legacy "
+            "AND indexname NOT LIKE '%pkey'"
+        ), {'legacy': legacy}).scalars().all():
+            conn.exec_driver_sql(f'DROP INDEX "{name}"')
+        create_partitioned_vendas(conn)
+        ensure_partitions(conn, since=first.date() if first else None)
+        copied = conn.execute(text(f"INSERT INTO {FACT_TABLE} SELECT * FROM {legacy}")).rowcount
+        conn.exec_driver_sql(f"DROP TABLE {legacy}")
+        create_vendas_view(conn)
+        print(f"DEBUG: {copied} linha(s) copiadas para a tabela particionada")
+
+
+def partition_status(conn):
+    """[(partição, linhas)] em ordem de nome."""
+    return conn.execute(text(
+        "SELECT c.relname, c.reltuples::bigint FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :name ORDER BY c.relname"
+    ), {'name': FACT_TABLE}).all()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Manutenção das partições mensais de vendas_fato.")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    criar = sub.add_parser('criar', help="cria as partições que faltam")
+    criar.add_argument('--meses', type=int, default=MONTHS_AHEAD,
+                       help="meses à frente do atual (padrão: %(default)s)")
+    criar.add_argument('--desde', help="primeiro mês (AAAA-MM); padrão: mês atual")
+    sub.add_parser('converter', help="converte a vendas_fato atual para particionada")
+    sub.add_parser('status', help="lista as partições e o número estimado de linhas")
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    if engine.dialect.name != 'postgresql':
+        print("Particionamento só é suportado no PostgreSQL.", file=sys.stderr)
+        return 2
+
+    if args.comando == 'converter':
+        convert_to_partitioned(engine)
+        return 0
+
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            print(f"{FACT_TABLE} não é particionada (use 'converter').", file=sys.stderr)
+            return 2
+        if args.comando == 'criar':
+            since = date.fromisoformat(f"{args.desde}-01") if args.desde else None
+            created = ensure_partitions(conn, args.meses, since)
+            print(f"Partições criadas: {', '.join(created) or 'nenhuma'}")
+        else:
+            for name, rows in partition_status(conn):
+                print(f"{name:<20} {max(rows, 0):>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
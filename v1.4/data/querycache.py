@@ -0,0 +1,256 @@
+import copy
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+from collections import OrderedDict
+from typing import Callable
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.db import get_engine, get_warehouse_version
+
+
+class QueryCache:
+    """
+    Cache dos resultados das consultas do modo banco (filtros e visualização).
+
+    A chave é a função + os parâmetros + o banco (URL sem a senha) + a
+    versão do armazém (tabela versao_dw, incrementada na transação de cada
+    lote gravado), então um upload novo invalida tudo sem precisar apagar
+    nada: as entradas antigas só deixam de ser encontradas e saem pelo LRU.
+    O banco na chave evita servir, do disco ou depois de um
+    configure_engine(), o resultado de outro armazém com a mesma versão. A memória é limitada em
+    `max_bytes`; com `disk=True` os resultados também vão para o disco
+    (pickle), e sobrevivem a um reinício do programa.
+    """
+    DEFAULT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'datawarehouse-system',
+                               'consultas')
+    DEFAULT_MAX_MB = 256
+    DEFAULT_DISK_MAX_MB = 1024
+
+    def __init__(self, max_bytes: int = None, disk: bool = None, cache_dir: str = None,
+                 disk_max_bytes: int = None):
+        if max_bytes is None:
+            max_bytes = int(os.getenv("DW_QUERY_CACHE_MAX_MB", self.DEFAULT_MAX_MB)) * 1024 * 1024
+        if disk is None:
+            disk = os.getenv("DW_QUERY_CACHE_DISK", "0") in ("1", "true", "True")
+        if disk_max_bytes is None:
+            disk_max_bytes = int(os.getenv("DW_QUERY_CACHE_DISK_MAX_MB",
+                                           self.DEFAULT_DISK_MAX_MB)) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.disk = disk
+        self.cache_dir = cache_dir or os.getenv("DW_QUERY_CACHE_DIR", self.DEFAULT_DIR)
+        self.disk_max_bytes = disk_max_bytes
+        self.enabled = os.getenv("DW_QUERY_CACHE_DISABLED", "") == ""
+        self._entries = OrderedDict()  # chave -> (resultado, tamanho)
+        self._bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # --- chave --------------------------------------------------------------
+
+    @staticmethod
+    def _normalize(value):
+        if isinstance(value, pd.DataFrame):
+            return None  # o frame não entra na chave (ver `cached`)
+        if isinstance(value, (list, tuple, set, frozenset)):
+            items = [QueryCache._normalize(v) for v in value]
+            return tuple(sorted(items, key=repr) if isinstance(value, (set, frozenset)) else items)
+        if isinstance(value, dict):
+            return tuple(sorted((k, QueryCache._normalize(v)) for k, v in value.items()))
+        return value
+
+    @staticmethod
+    def database() -> str:
+        return get_engine().url.render_as_string(hide_password=True)
+
+    def make_key(self, func: Callable, params: dict, version: int, database: str) -> str:
+        raw = repr((func.__module__, func.__qualname__, self._normalize(params), database,
+                    version))
+        return hashlib.blake2b(raw.encode(), digest_size=20).hexdigest()
+
+    # --- memória ------------------------------------------------------------
+
+    @staticmethod
+    def _size(value) -> int:
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(index=True, deep=True).sum())
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @staticmethod
+    def _copy(value):
+        # Quem chama pode alterar o resultado; o cache guarda o original
+        if isinstance(value, pd.DataFrame):
+            return value.copy()
+        return copy.deepcopy(value)
+
+    def _remember(self, key: str, value) -> None:
+        size = self._size(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, old) = self._entries.popitem(last=False)
+            self._bytes -= old
+
+    # --- disco --------------------------------------------------------------
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _disk_load(self, key: str):
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)  # marca como usado recentemente
+            return value
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"DEBUG: Entrada de cache de consulta inválida ({e}), descartando")
+            self._remove(path)
+            return None
+
+    def _disk_store(self, key: str, value) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._disk_path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"DEBUG: Não foi possível gravar a consulta no cache: {e}")
+            self._remove(tmp)
+            return
+        self._disk_evict()
+
+    def _disk_entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl'):
+                path = os.path.join(self.cache_dir, name)
+                st = os.stat(path)
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _disk_evict(self) -> None:
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.disk_max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    # --- API ----------------------------------------------------------------
+
+    def get_or_compute(self, func: Callable, args: tuple, kwargs: dict, params: dict = None):
+        """`params` (padrão: args + kwargs) é o que identifica a chamada na chave."""
+        if params is None:
+            params = {'args': args, 'kwargs': kwargs}
+        key = self.make_key(func, params, get_warehouse_version(), self.database())
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            print(f"DEBUG: Cache de consulta: hit em {func.__name__}")
+            return self._copy(self._entries[key][0])
+
+        if self.disk:
+            value = self._disk_load(key)
+            if value is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                print(f"DEBUG: Cache de consulta: hit (disco) em {func.__name__}")
+                self._remember(key, value)
+                return self._copy(value)
+
+        self.misses += 1
+        value = func(*args, **kwargs)
+        self._remember(key, value)
+        if self.disk:
+            self._disk_store(key, value)
+        return self._copy(value)
+
+    def cached(self, func: Callable) -> Callable:
+        """
+        Decorador para as funções de consulta no formato `f(df, ..., batch_ids=None)`.
+
+        Com `df` não vazio e sem `batch_ids` a função roda em pandas, sem
+        banco, e não passa pelo cache; nos outros casos o `df` fica fora da
+        chave e `batch_ids` é normalizado (um id ou uma lista).
+        """
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            df = params.get('df')
+            batch_ids = params.get('batch_ids')
+            if isinstance(batch_ids, str):
+                params['batch_ids'] = (batch_ids,)
+            if isinstance(df, pd.DataFrame) and not df.empty and not batch_ids:
+                return func(*args, **kwargs)
+            return self.get_or_compute(func, args, kwargs, params)
+        return wrapper
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+        }
+
+    def clear(self, disk: bool = True) -> int:
+        """Esvazia a memória (e o disco, se `disk`) e retorna quantas entradas saíram."""
+        removed = len(self._entries)
+        self._entries.clear()
+        self._bytes = 0
+        if disk:
+            for _, _, path in self._disk_entries():
+                self._remove(path)
+                removed += 1
+        return removed
+
+
+query_cache = QueryCache()
+cached_query = query_cache.cached
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'clear':
+        print(f"{query_cache.clear()} entrada(s) removida(s) de {query_cache.cache_dir}")
+    else:
+        entries = query_cache._disk_entries()
+        print(f"Cache em disco: {query_cache.cache_dir} "
+              f"({'ativo' if query_cache.disk else 'desativado; DW_QUERY_CACHE_DISK=1'})")
+        print(f"Entradas: {len(entries)}  "
+              f"Tamanho: {sum(size for _, size, _ in entries) / 1024 ** 2:.1f} MB de "
+              f"{query_cache.disk_max_bytes / 1024 ** 2:.0f} MB")
@@ -0,0 +1,84 @@
+"""
+Resumos por lote e por mês, atualizados na mesma transação da ingestão.
+
+Ao gravar um lote, `update_rollups` agrega as linhas dele em vendas_fato
+(pelo índice de batch_id) por vendedor × consorciado × status: o resultado
+vai inteiro para resumo_lote e é somado em resumo_mensal com um upsert
+(INSERT ... SELECT ... ON CONFLICT DO UPDATE no PostgreSQL e no SQLite).
+"""
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.sql.expression import BindParameter
+
+from data.db import resumo_lote, resumo_mensal, vendas_fato
+
+MEASURES = {
+    'liquido_reais': vendas_fato.c.liquido_reais,
+    'base_reais': vendas_fato.c.base_reais,
+    'comissao_reais': vendas_fato.c.comissao_reais,
+    'estorno_reais': vendas_fato.c.estorno_reais,
+}
+
+
+def _group_keys():
+    return {
+        'vendedor_id': func.coalesce(vendas_fato.c.vendedor_id, 0),
+        'consorciado_id': func.coalesce(vendas_fato.c.consorciado_id, 0),
+        'status_cota': func.coalesce(vendas_fato.c.status_cota, ''),
+    }
+
+
+def _rollup_select(leading: dict, where=None):
+    """
+    SELECT agregado de vendas_fato: colunas de `leading` + chaves + medidas.
+    Valores constantes em `leading` (ex.: o batch_id do lote) não entram no GROUP BY.
+    """
+    keys = {**leading, **_group_keys()}
+    columns = [expr.label(name) for name, expr in keys.items()]
+    columns += [func.coalesce(func.sum(expr), 0).label(name) for name, expr in MEASURES.items()]
+    columns.append(func.count().label('num_vendas'))
+    stmt = select(*columns)
+    if where is not None:
+        stmt = stmt.where(where)
+    group_by = [expr for expr in keys.values() if not isinstance(expr, BindParameter)]
+    return stmt.group_by(*group_by), list(keys) + list(MEASURES) + ['num_vendas']
+
+
+def _month_key():
+    return func.coalesce(vendas_fato.c.data_venda_id // 100, 0)
+
+
+def _upsert_monthly(sess, stmt, names):
+    dialect = sess.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise NotImplementedError(f"Resumo mensal sem suporte a upsert em {dialect}")
+    upsert = dialect_insert(resumo_mensal).from_select(names, stmt)
+    sess.execute(upsert.on_conflict_do_update(
+        index_elements=[c.name for c in resumo_mensal.primary_key],
+        set_={name: resumo_mensal.c[name] + upsert.excluded[name]
+              for name in list(MEASURES) + ['num_vendas']},
+    ))
+
+
+def update_rollups(sess, batch_id: str) -> None:
+    """Adiciona o lote aos resumos (chamar antes do commit do lote)."""
+    stmt, names = _rollup_select({'batch_id': literal(batch_id)},
+                                 vendas_fato.c.batch_id == batch_id)
+    sess.execute(insert(resumo_lote).from_select(names, stmt))
+
+    stmt, names = _rollup_select({'mes': _month_key()}, vendas_fato.c.batch_id == batch_id)
+    _upsert_monthly(sess, stmt, names)
+
+
+def rebuild_rollups(conn) -> None:
+    """Recalcula os dois resumos do zero a partir de vendas_fato."""
+    conn.execute(resumo_lote.delete())
+    conn.execute(resumo_mensal.delete())
+    stmt, names = _rollup_select({'batch_id': vendas_fato.c.batch_id},
+                                 vendas_fato.c.batch_id != None)
+    conn.execute(insert(resumo_lote).from_select(names, stmt))
+    stmt, names = _rollup_select({'mes': _month_key()})
+    conn.execute(insert(resumo_mensal).from_select(names, stmt))
@@ -0,0 +1,183 @@
+import os
+import uuid
+from datetime import datetime
+from typing import Iterable, Optional
+import pandas as pd
+from sqlalchemy import (Column, DateTime, Integer, MetaData, String, Table,
+                        delete, func, insert, inspect, select, update)
+from sqlalchemy.schema import CreateTable
+
+from data.db import (Session, bump_warehouse_version, get_engine, uploads, vendas_fato,
+                     vendas_rejeitadas, _clean_vendas, _insert_rejected, _insert_vendas_chunk,
+                     _resolve_bulk_method)
+from data.rollups import update_rollups
+
+staging_metadata = MetaData()
+
+# Mesmas colunas de vendas_fato (sem o id) + o número do bloco de origem.
+# No PostgreSQL é criada como UNLOGGED: sem WAL, a escrita é bem mais barata
+# e o conteúdo é descartável até a promoção.
+vendas_staging = Table(
+    'vendas_staging', staging_metadata,
+    *[Column(c.name, c.type) for c in vendas_fato.columns if c.name != 'id'],
+    Column('chunk_no', Integer),
+)
+
+upload_checkpoints = Table(
+    'upload_checkpoints', staging_metadata,
+    Column('batch_id', String, primary_key=True),
+    Column('resume_key', String, index=True),
+    Column('origem_arquivo', String),
+    Column('chunk_size', Integer),
+    Column('chunks_done', Integer, default=0),
+    Column('rows_staged', Integer, default=0),
+    Column('status', String),  # 'staging' | 'promovido'
+    Column('updated_at', DateTime, default=datetime.utcnow),
+)
+
+STAGING_BATCH_SIZE = int(os.getenv("VENDAS_STAGING_BATCH", "50000"))
+
+
+def init_staging():
+    """Cria a tabela de staging (UNLOGGED no PostgreSQL) e a de checkpoints."""
+    engine = get_engine()
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        if not insp.has_table(vendas_staging.name):
+            ddl = str(CreateTable(vendas_staging).compile(engine))
+            if engine.dialect.name == 'postgresql':
+                ddl = ddl.replace('CREATE TABLE', 'CREATE UNLOGGED TABLE', 1)
+            conn.exec_driver_sql(ddl)
+    upload_checkpoints.create(engine, checkfirst=True)
+
+
+def _find_checkpoint(sess, resume_key, chunk_size):
+    row = sess.execute(
+        select(upload_checkpoints)
+        .where(upload_checkpoints.c.resume_key == resume_key,
+               upload_checkpoints.c.status == 'staging')
+        .order_by(upload_checkpoints.c.updated_at.desc())
+    ).mappings().first()
+    if row is None:
+        return None
+    if row['chunk_size'] != chunk_size:
+        # Blocos de outro tamanho não batem com os já enviados: recomeça
+        print(f"DEBUG: Checkpoint {row['batch_id']} com outro chunk_size, descartando")
+        _discard(sess, row['batch_id'])
+        return None
+    staged = sess.execute(
+        select(func.count()).select_from(vendas_staging)
+        .where(vendas_staging.c.batch_id == row['batch_id'])
+    ).scalar()
+    if staged != row['rows_staged']:
+        # No PostgreSQL o staging é UNLOGGED: uma queda do servidor o esvazia,
+        # mas o checkpoint (logado) sobrevive. Promover daria um lote parcial.
+        print(f"DEBUG: Checkpoint {row['batch_id']} com {staged} de {row['rows_staged']} "
+              f"linha(s) no staging, recomeçando")
+        _discard(sess, row['batch_id'])
+        return None
+    return row
+
+
+def _discard(sess, batch_id):
+    sess.execute(delete(vendas_staging).where(vendas_staging.c.batch_id == batch_id))
+    sess.execute(delete(vendas_rejeitadas).where(vendas_rejeitadas.c.batch_id == batch_id))
+    sess.execute(delete(upload_checkpoints).where(upload_checkpoints.c.batch_id == batch_id))
+    sess.commit()
+
+
+def insert_upload_and_vendas_resumable(chunks: Iterable[pd.DataFrame], origem_arquivo: str,
+                                       resume_key: str, chunk_size: int,
+                                       method: Optional[str] = None) -> str:
+    """
+    Insere um lote em blocos, com commit e checkpoint a cada bloco.
+
+    Os blocos vão primeiro para vendas_staging; cada bloco e o avanço do
+    checkpoint são gravados na mesma transação. Se o envio cair no meio,
+    chamar de novo com o mesmo `resume_key` (ex.: hash do arquivo) e o mesmo
+    `chunk_size` pula os blocos já gravados (se o staging ainda tiver as
+    linhas que o checkpoint registra; senão recomeça do bloco 0). No fim, as linhas são
+    promovidas para vendas_fato junto com a linha de uploads numa única
+    transação, e o staging do lote é limpo.
+    """
+    init_staging()
+    sess = Session()
+    try:
+        method = _resolve_bulk_method(sess, method)
+        checkpoint = _find_checkpoint(sess, resume_key, chunk_size)
+        if checkpoint:
+            batch_id = checkpoint['batch_id']
+            done = checkpoint['chunks_done']
+            rows = checkpoint['rows_staged']
+            print(f"DEBUG: Retomando lote {batch_id} a partir do bloco {done}")
+        else:
+            batch_id = str(uuid.uuid4())
+            done, rows = 0, 0
+            sess.execute(insert(upload_checkpoints).values(
+                batch_id=batch_id, resume_key=resume_key,
+                origem_arquivo=os.path.basename(origem_arquivo),
+                chunk_size=chunk_size, chunks_done=0, rows_staged=0, status='staging'
+            ))
+            sess.commit()
+
+        offset = 0
+        for chunk_no, chunk in enumerate(chunks):
+            start, offset = offset, offset + len(chunk)
+            if chunk_no < done:
+                continue
+            records, rejected = _clean_vendas(chunk, start)
+            records['chunk_no'] = chunk_no
+            _insert_vendas_chunk(sess, records, batch_id, method, table=vendas_staging)
+            _insert_rejected(sess, rejected, batch_id, origem_arquivo)
+            rows += len(records)
+            sess.execute(
+                update(upload_checkpoints)
+                .where(upload_checkpoints.c.batch_id == batch_id)
+                .values(chunks_done=chunk_no + 1, rows_staged=rows,
+                        updated_at=datetime.utcnow())
+            )
+            sess.commit()
+
+        _promote(sess, batch_id, origem_arquivo, rows)
+    except Exception:
+        sess.rollback()
+        raise
+    finally:
+        sess.close()
+    return batch_id
+
+
+def _promote(sess, batch_id, origem_arquivo, rows):
+    columns = [c.name for c in vendas_fato.columns if c.name != 'id']
+    sess.execute(uploads.insert().values(
+        id=batch_id,
+        origem_arquivo=os.path.basename(origem_arquivo),
+        num_registros=rows
+    ))
+    sess.execute(
+        insert(vendas_fato).from_select(
+            columns,
+            select(*[vendas_staging.c[c] for c in columns])
+            .where(vendas_staging.c.batch_id == batch_id)
+        )
+    )
+    update_rollups(sess, batch_id)
+    bump_warehouse_version(sess)
+    sess.execute(delete(vendas_staging).where(vendas_staging.c.batch_id == batch_id))
+    sess.execute(
+        update(upload_checkpoints)
+        .where(upload_checkpoints.c.batch_id == batch_id)
+        .values(status='promovido', updated_at=datetime.utcnow())
+    )
+    sess.commit()
+
+
+def upload_file_resumable(file_path: str, chunk_size: int = STAGING_BATCH_SIZE,
+                          method: Optional[str] = None) -> str:
+    """Lê o arquivo em blocos e envia com `insert_upload_and_vendas_resumable`."""
+    from backend.dataloader_db import DataLoader_db
+    from data.filecache import FileCache
+
+    resume_key = f"{FileCache.file_hash(file_path)}-{DataLoader_db.LOADER_VERSION}"
+    chunks = DataLoader_db.load_db_chunks(file_path, chunk_size=chunk_size)
+    return insert_upload_and_vendas_resumable(chunks, file_path, resume_key, chunk_size, method)
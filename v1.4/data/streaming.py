@@ -0,0 +1,192 @@
+"""
+Leitura de resultados grandes em blocos, sem materializar a lista de linhas.
+
+`iter_frames` executa a consulta com stream_results/yield_per (cursor no
+servidor no PostgreSQL) e devolve um DataFrame por bloco, montado coluna a
+coluna. `fetch_frame` junta os blocos num DataFrame só, guardando por coluna
+os arrays de cada bloco em vez das linhas.
+
+No PostgreSQL com psycopg2, `copy_frame` roda COPY (SELECT ...) TO STDOUT
+e lê o CSV com o leitor em C do pandas, com dtypes definidos pelos tipos
+das colunas da consulta. `read_frame` escolhe entre os dois caminhos.
+"""
+import io
+import os
+import sys
+from typing import Iterator, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import Date, DateTime, Integer, Numeric
+
+from data.db import Session
+
+FETCH_CHUNK_SIZE = int(os.getenv("DB_FETCH_CHUNK", "20000"))
+
+
+def _column_arrays(rows: list, width: int) -> List[np.ndarray]:
+    if not rows:
+        return [np.empty(0, dtype=object) for _ in range(width)]
+    return [np.array(col, dtype=object) for col in zip(*rows)]
+
+
+def iter_frames(stmt, chunk_size: int = FETCH_CHUNK_SIZE, session=None) -> Iterator[pd.DataFrame]:
+    """
+    Gera um DataFrame por bloco de até `chunk_size` linhas.
+
+    Sem `session`, abre uma sessão própria que fica aberta enquanto o
+    gerador é consumido.
+    """
+    own = session is None
+    session = Session() if own else session
+    try:
+        result = session.execute(
+            stmt, execution_options={'stream_results': True, 'yield_per': chunk_size}
+        )
+        columns = list(result.keys())
+        for rows in result.partitions(chunk_size):
+            arrays = _column_arrays(rows, len(columns))
+            del rows
+            yield pd.DataFrame({
+                name: pd.Series(values).infer_objects()
+                for name, values in zip(columns, arrays)
+            })
+        result.close()
+    finally:
+        if own:
+            session.close()
+
+
+def fetch_frame(stmt, chunk_size: int = FETCH_CHUNK_SIZE, session=None) -> pd.DataFrame:
+    """
+    DataFrame com o resultado inteiro, lido em blocos.
+
+    Cada bloco vira um array por coluna; no fim cada coluna é concatenada
+    uma vez (o pico de memória é o resultado + uma coluna, e não o
+    resultado em linhas + o DataFrame).
+    """
+    own = session is None
+    session = Session() if own else session
+    try:
+        result = session.execute(
+            stmt, execution_options={'stream_results': True, 'yield_per': chunk_size}
+        )
+        columns = list(result.keys())
+        parts = [[] for _ in columns]
+        total = 0
+        for rows in result.partitions(chunk_size):
+            total += len(rows)
+            for part, values in zip(parts, _column_arrays(rows, len(columns))):
+                part.append(values)
+            del rows
+        result.close()
+    finally:
+        if own:
+            session.close()
+
+    data = {}
+    for name, part in zip(columns, parts):
+        values = np.concatenate(part) if part else np.empty(0, dtype=object)
+        part.clear()
+        data[name] = pd.Series(values).infer_objects()
+    print(f"DEBUG: Retrieved {total} rows")
+    return pd.DataFrame(data, columns=columns)
+
+
+def _supports_copy(session) -> bool:
+    bind = session.get_bind()
+    return bind.dialect.name == 'postgresql' and bind.dialect.driver == 'psycopg2'
+
+
+def _csv_dtypes(stmt):
+    """(dtype por coluna, colunas de data) a partir dos tipos da consulta."""
+    dtypes, dates = {}, []
+    for column in stmt.selected_columns:
+        kind = column.type
+        if isinstance(kind, (DateTime, Date)):
+            dates.append(column.key)
+        elif isinstance(kind, Integer):
+            dtypes[column.key] = 'Int64'
+        elif isinstance(kind, Numeric):
+            dtypes[column.key] = 'float64'
+        else:
+            dtypes[column.key] = object
+    return dtypes, dates
+
+
+def _copy_query(stmt, dialect):
+    """
+    SQL e parâmetros do SELECT para o COPY. render_postcompile expande as
+    listas do IN (batch_id.in_(...)) em parâmetros comuns, que o mogrify
+    entende; sem ele o texto iria com o marcador __[POSTCOMPILE_...].
+    """
+    compiled = stmt.compile(dialect=dialect, compile_kwargs={'render_postcompile': True})
+    return str(compiled), compiled.params
+
+
+def copy_frame(stmt, session=None) -> pd.DataFrame:
+    """
+    DataFrame via COPY (SELECT ...) TO STDOUT (só PostgreSQL + psycopg2).
+
+    Números viram float64/Int64 e datas datetime64 direto no parser, sem um
+    objeto Python por célula. Texto vazio continua '' (o nulo é \\N).
+    """
+    own = session is None
+    session = Session() if own else session
+    try:
+        sql, params = _copy_query(stmt, session.get_bind().dialect)
+        dbapi_conn = session.connection().connection.dbapi_connection
+        buf = io.StringIO()
+        with dbapi_conn.cursor() as cur:
+            sql = cur.mogrify(sql, params).decode()
+            cur.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER, NULL '\\N')", buf)
+    finally:
+        if own:
+            session.close()
+
+    buf.seek(0)
+    dtypes, dates = _csv_dtypes(stmt)
+    df = pd.read_csv(buf, dtype=dtypes, parse_dates=dates, na_values=['\\N'],
+                     keep_default_na=False, engine='c')
+    print(f"DEBUG: Retrieved {len(df)} rows")
+    return df
+
+
+def read_frame(stmt, session=None) -> pd.DataFrame:
+    """COPY TO STDOUT no PostgreSQL; nos outros bancos, `fetch_frame`."""
+    own = session is None
+    session = Session() if own else session
+    try:
+        if _supports_copy(session):
+            return copy_frame(stmt, session)
+        return fetch_frame(stmt, session=session)
+    finally:
+        if own:
+            session.close()
+
+
+if __name__ == "__main__":
+    # Compara o pico de memória com o .mappings().all() + pd.DataFrame:
+    #   python -m data.streaming [linhas]
+    import time
+    import tracemalloc
+    from sqlalchemy import select
+    from data.db import vendas
+
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    stmt = select(vendas).limit(limit)
+    for name, load in (
+        ('mappings().all()', lambda: pd.DataFrame(Session().execute(stmt).mappings().all())),
+        ('fetch_frame', lambda: fetch_frame(stmt)),
+    ):
+        tracemalloc.start()
+        start = time.perf_counter()
+        df = load()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:<18} {len(df):>9} linhas  {elapsed:6.2f}s  pico {peak / 2**20:8.1f} MB")
+        del df
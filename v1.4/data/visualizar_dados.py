@@ -5,20 +5,24 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from data.db import Session, vendas
+from data.db import query_vendas, vendas
+from data.querycache import cached_query
+from data.streaming import fetch_frame
 
-def visualizer_data_db(df: pd.DataFrame) -> pd.DataFrame:
+@cached_query
+def visualizer_data_db(df: pd.DataFrame, batch_ids=None) -> pd.DataFrame:
     print("DEBUG: Calling visualizer_data()")
-    if not df.empty:
+    batch_ids = [batch_ids] if isinstance(batch_ids, str) else list(batch_ids or [])
+    if not df.empty and not batch_ids:
         print(df)
         return df
     else:
-        with Session() as session:
-            stmt = select(vendas)
-            print(f"DEBUG: Executing SQL: {stmt}")
-            records = session.execute(stmt).mappings().all()
-            print(f"DEBUG: Retrieved {len(records)} rows")
-        return pd.DataFrame(records)
+        if batch_ids:
+            print(f"DEBUG: Loading batches {batch_ids}")
+            return query_vendas(batch_ids=batch_ids)
+        stmt = select(vendas)
+        print(f"DEBUG: Executing SQL: {stmt}")
+        return fetch_frame(stmt)
     
     
 def visualizer_data_local(df: pd.DataFrame) -> pd.DataFrame:
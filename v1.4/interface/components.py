@@ -9,6 +9,19 @@ from backend.report_generator import ReportGenerator, RelatorioToDf
 
 
 class MainUIBuilder(DataOrigin):
+    def analytics_snapshot(self):
+        """
+        Os três agregados dos botões de totais e do relatório, calculados
+        juntos numa leitura só. No modo banco ficam no cache de consultas; no
+        local, guardados até trocar o DataFrame.
+        """
+        if self.functionExport == "Banco de dados":
+            return analytics_snapshot_db(self.df, self.current_batch_id)
+        if getattr(self, '_snapshot_df', None) is not self.df:
+            self._snapshot = analytics_snapshot_local(self.df)
+            self._snapshot_df = self.df
+        return self._snapshot
+
     def reset_UI(self):
         for widget in self.winfo_children():
             widget.destroy()
@@ -51,11 +64,13 @@ class MainUIBuilder(DataOrigin):
             
             self.combo_batch = ttk.Combobox(
                 lbl_select,
-                state="readonly",
                 width=60,
                 values=[]
             )
             self.combo_batch.grid(row=1, column=0, sticky='e', padx=5, pady=(2, 10))
+            # Digitar filtra pelo começo do nome do arquivo (consulta no banco)
+            self.combo_batch.bind("<KeyRelease>", self.search_batches)
+            self.combo_batch.bind("<<ComboboxSelected>>", self.on_batch_selected)
 
             btn_load_vendas = ttk.Button(
                 lbl_select,
@@ -93,10 +108,10 @@ class MainUIBuilder(DataOrigin):
             if self.functionExport == "Banco de dados":
                 # recarrega os batch IDs incluindo novo upload
                 self.load_batch_ids()
-                # ajusta combobox para exibir o mais recente
-                ids = list(self.combo_batch['values'])
+                # ajusta combobox para exibir o mais recente (primeiro da lista)
+                ids = list(self.batch_map)
                 if ids:
-                    self.combo_batch.set(ids[-1])
+                    self.combo_batch.set(ids[0])
 
         btn_browse = ttk.Button(
             file_frame,
@@ -106,6 +121,27 @@ class MainUIBuilder(DataOrigin):
         )
         btn_browse.grid(row=0, column=1, sticky='e')
 
+        # Importação em lote: vários arquivos ou uma pasta, um lote por arquivo
+        if self.functionExport == "Banco de dados":
+            def on_bulk_import(command):
+                command()
+                self.load_batch_ids()
+
+            bulk_frame = ttk.Frame(file_frame)
+            bulk_frame.grid(row=1, column=0, columnspan=2, sticky='e', pady=(10, 0))
+            ttk.Button(
+                bulk_frame,
+                text="Importar Vários",
+                style='TButton',
+                command=lambda: on_bulk_import(self.load_many_files)
+            ).pack(side='left', padx=(0, 10))
+            ttk.Button(
+                bulk_frame,
+                text="Importar Pasta",
+                style='TButton',
+                command=lambda: on_bulk_import(self.load_folder)
+            ).pack(side='left')
+
         # Frame de Filtros Rápidos
         filters_frame = ttk.LabelFrame(
             main_frame,
@@ -121,7 +157,7 @@ class MainUIBuilder(DataOrigin):
             filters_frame,
             text="Em Atraso",
             command=lambda: self.display_df(
-                filter_status_atraso_db(self.df) if self.functionExport == "Banco de dados" else filter_status_atraso_local(self.df),
+                filter_status_atraso_db(self.df, self.current_batch_id) if self.functionExport == "Banco de dados" else filter_status_atraso_local(self.df),
                 "Vendas em Atraso"
             )
         )
@@ -129,7 +165,7 @@ class MainUIBuilder(DataOrigin):
             filters_frame,
             text="Ano 2025",
             command=lambda: self.display_df(
-                filter_by_year_db(self.df, 2025) if self.functionExport == "Banco de dados" else filter_by_year_local(self.df, 2025),
+                filter_by_year_db(self.df, 2025, self.current_batch_id) if self.functionExport == "Banco de dados" else filter_by_year_local(self.df, 2025),
                 "Vendas 2025"
             )
         )
@@ -137,7 +173,7 @@ class MainUIBuilder(DataOrigin):
             filters_frame,
             text="Total Líq. por Vendedor",
             command=lambda: self.display_df(
-                total_liquido_por_vendedor_db(self.df) if self.functionExport == "Banco de dados" else total_liquido_por_vendedor_local(self.df),
+                self.analytics_snapshot()['por_vendedor'],
                 "Total Líquido"
             )
         )
@@ -145,7 +181,7 @@ class MainUIBuilder(DataOrigin):
             filters_frame,
             text="Total Líq. por Consórcio e Vendedor",
             command=lambda: self.display_df(
-                total_liquido_por_consorcio_vendedor_db(self.df) if self.functionExport == "Banco de dados" else total_liquido_por_consorcio_vendedor_local(self.df),
+                self.analytics_snapshot()['por_consorcio_vendedor'],
                 "Total Líquido"
             )
         )
@@ -153,9 +189,7 @@ class MainUIBuilder(DataOrigin):
             filters_frame,
             text="Relatório Consorciados",
             command=lambda: self.display_df(
-                RelatorioToDf.generate(
-                    relatorio_por_consorciado_db(self.df) if self.functionExport == "Banco de dados" else relatorio_por_consorciado_local(self.df)
-                ),
+                RelatorioToDf.generate(self.analytics_snapshot()['relatorio']),
                 "Total Líquido - Relatório"
             )
         )
@@ -201,7 +235,7 @@ class MainUIBuilder(DataOrigin):
             visualizar_frame,
             text="Visualizar",
             command=lambda: self.display_df(
-                visualizer_data_db(self.df) if self.functionExport == "Banco de dados" else visualizer_data_local(self.df),
+                visualizer_data_db(self.df, self.current_batch_id) if self.functionExport == "Banco de dados" else visualizer_data_local(self.df),
                 "Dados", True
             )
         )
@@ -28,5 +28,6 @@ class App(
         self.setup_style()
         self.report_gen = ReportGenerator()
         self.df = pd.DataFrame()
+        self.current_batch_id = None
         self.numeric_columns = []
         self.setup_UI()
\ No newline at end of file
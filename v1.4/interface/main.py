@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -9,5 +10,7 @@ from data.db import *
 
 
 if __name__ == '__main__':
+    # Necessário no executável do PyInstaller para os pools de processos
+    multiprocessing.freeze_support()
     app = App()
     app.mainloop()
\ No newline at end of file
@@ -1,12 +1,12 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from sqlalchemy import select
+import pandas as pd
 import sys
 import os
 
 # Adiciona o diretório pai ao sys.path para importar o módulo corretamente
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from data.db import Session, uploads, query_vendas_by_batch, query_vendas_by_name
+from data.db import UPLOADS_PAGE_SIZE, list_uploads, recent_uploads
 
 class TableSelect():
     def __init__(self):
@@ -16,19 +16,57 @@ class TableSelect():
         self.df
         self.choiceTable()
 
+    MORE_BATCHES = "Carregar mais…"
+    SEARCH_DELAY_MS = 300
+
     def load_batch_ids(self):
-        session = Session()
-        # Busca origem_arquivo e data_upload
-        result = session.execute(select(uploads.c.origem_arquivo, uploads.c.data_upload)).all()
-        session.close()
+        # Só a página mais recente (do cache até o próximo upload); o resto
+        # vem pela busca ou por "Carregar mais…"
+        self._show_batches(recent_uploads(), prefix='')
         print("resetou")
-        # Exibe no combobox como "arquivo - data"
-        display_values = [f"{row.origem_arquivo} - {row.data_upload.strftime('%Y-%m-%d')}" for row in result]
-        self.batch_map = {f"{row.origem_arquivo} - {row.data_upload.strftime('%Y-%m-%d')}": row.origem_arquivo for row in result}
+        values = list(self.batch_map)
+        if values:
+            self.combo_batch.set(values[0])
+
+    def _show_batches(self, rows, prefix, append=False):
+        if not append:
+            self.batch_map = {}
+        for batch_id, origem_arquivo, data_upload, _ in rows:
+            label = f"{origem_arquivo} - {data_upload:%Y-%m-%d %H:%M}" if data_upload else origem_arquivo
+            if label in self.batch_map:
+                label = f"{label} [{batch_id[:8]}]"
+            self.batch_map[label] = batch_id
+        # Cursor da próxima página (data_upload, id) se esta veio cheia
+        self._batch_prefix = prefix
+        self._batch_cursor = (rows[-1][2], rows[-1][0]) if len(rows) == UPLOADS_PAGE_SIZE else None
+        values = list(self.batch_map)
+        if self._batch_cursor is not None:
+            values.append(self.MORE_BATCHES)
+        self.combo_batch['values'] = values
+
+    def search_batches(self, event=None):
+        """Busca por prefixo do nome enquanto o usuário digita (com atraso, para não consultar a cada tecla)."""
+        if event is not None and event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+            return
+        if getattr(self, '_search_job', None):
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(self.SEARCH_DELAY_MS, self._run_search)
 
-        self.combo_batch['values'] = display_values
-        if display_values:
-            self.combo_batch.set(display_values[0])
+    def _run_search(self):
+        self._search_job = None
+        text = self.combo_batch.get().strip()
+        if text in self.batch_map:
+            return
+        rows = list_uploads(prefix=text) if text else recent_uploads()
+        self._show_batches(rows, prefix=text)
+
+    def on_batch_selected(self, event=None):
+        if self.combo_batch.get() != self.MORE_BATCHES:
+            return
+        rows = list_uploads(prefix=self._batch_prefix, after=self._batch_cursor)
+        self._show_batches(rows, prefix=self._batch_prefix, append=True)
+        self.combo_batch.set(self._batch_prefix)
+        self.combo_batch.event_generate('<Down>')  # reabre a lista já com a página nova
 
     def load_vendas(self):
         selected = self.combo_batch.get()
@@ -37,10 +75,10 @@ class TableSelect():
             messagebox.showwarning("Atenção", "Selecione um item válido.")
             return
 
-        origem_arquivo = self.batch_map[selected]
-        self.df = query_vendas_by_name(origem_arquivo)
-        if self.df.empty:
-            messagebox.showinfo("DataFrame vazio ou com erro")
+        # Só guarda o lote: os filtros consultam o banco com WHERE batch_id
+        # IN (...) e trazem apenas as linhas do resultado
+        self.current_batch_id = self.batch_map[selected]
+        self.df = pd.DataFrame()
 
 if __name__ == "__main__":
     app = TableSelect()
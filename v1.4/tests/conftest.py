@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+# Os módulos importam a partir da raiz v1.4 (from data.db import ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Caches em disco fora do ~/.cache do usuário
+os.environ.setdefault("DW_CACHE_DISABLED", "1")
+
+HEADER = ['DATA VENDA', 'DATA ALOCAÇÃO', 'CÓD COMISSIONADO', 'BEM', 'CÓD PV', 'CÓD EQUIPE',
+          'CONTRATO', 'CONSORCIADO', 'NOME CONSORCIADO', 'STATUS COTA', 'PARC/LIB', 'REGRA',
+          'CATEGORIA', 'COMISSAO %', 'BASE CÁLC COMISSAO', 'COMISSAO R$', 'ESTORNO R$',
+          'CANCELAMENTO COTA R$', 'BASE R$', 'LÍQUIDO R$', 'VENDEDOR']
+
+
+def sale(data_venda='28/03/2025', bem='AUTO', consorciado='1', nome='CLIENTE A',
+         status='C', liquido='100,00', vendedor='ANA'):
+    """Uma linha no layout do relatório de vendas (cabeçalhos de HEADER)."""
+    return [data_venda, '01/02/2025', '85', bem, '7', 'E1', '100000', consorciado, nome,
+            status, '1/60', 'R1', 'CAT', '1,5', '10.000,00', '150,00', '0,00', '0,00',
+            liquido, liquido, vendedor]
+
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in [HEADER] + rows:
+            f.write(';'.join('' if v is None else str(v) for v in row) + '\n')
+    return str(path)
+
+
+@pytest.fixture
+def warehouse(tmp_path):
+    """Banco SQLite novo (init_db) como engine compartilhada."""
+    from data import db
+    db.configure_engine(f"sqlite:///{tmp_path / 'dw.db'}")
+    db.init_db()
+    yield db
+    db.dispose_engine()
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import func, select
+
+import cli
+from conftest import sale, write_csv
+
+
+def test_resumable_requires_single_job(tmp_path):
+    path = write_csv(tmp_path / 'vendas.csv', [sale()])
+    with pytest.raises(SystemExit) as exc:
+        cli.main([path, '--resumable', '--jobs', '2'])
+    assert exc.value.code == 2
+
+
+def test_reports_inserted_and_rejected_rows(warehouse, tmp_path, capsys):
+    rows = [sale(), sale(vendedor='TOTAL'), sale(nome='CLIENTE B'), sale(vendedor='')]
+    path = write_csv(tmp_path / 'vendas.csv', rows)
+    assert cli.main([path]) == 0
+
+    out = capsys.readouterr().out
+    assert 'vendas.csv: 2 linhas (2 rejeitadas)' in out
+    assert 'Linhas:   2 gravadas  (rejeitadas: 2)' in out
+    with warehouse.Session() as sess:
+        assert sess.execute(select(warehouse.uploads.c.num_registros)).scalar() == 2
+
+
+def test_parallel_import_into_configured_engine(warehouse, tmp_path):
+    from data.bulk_import import bulk_import
+    paths = [write_csv(tmp_path / f'vendas{i}.csv', [sale(), sale(nome=f'CLIENTE {i}')])
+             for i in range(3)]
+    results = bulk_import(paths, processes=2)
+    assert [r['status'] for r in results] == ['ok'] * 3
+    with warehouse.Session() as sess:
+        assert sess.execute(select(func.count())
+                            .select_from(warehouse.vendas_fato)).scalar() == 6
@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+from backend import dataloader_db
+from backend.dataloader_db import DataLoader_db
+from conftest import sale, write_csv
+
+
+@pytest.fixture
+def bad_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataloader_db, 'REJECTED_DIR', str(tmp_path / 'rejeitadas'))
+    rows = [sale(liquido='10,00'), sale(liquido='abc'), sale(liquido='5,00'),
+            sale(liquido='1,00'), sale(liquido='x,y')]
+    return write_csv(tmp_path / 'vendas.csv', rows)
+
+
+def _report(path):
+    return pd.read_csv(path, sep=';', encoding='utf-8-sig')
+
+
+def test_rejected_cells_counted_in_attrs_and_reported(bad_csv):
+    df = DataLoader_db.load_db(bad_csv)
+    # BASE R$ e LÍQUIDO R$ recebem o mesmo valor nas linhas de teste
+    assert df.attrs['rejected_numeric'] == {'base_reais': 2, 'liquido_reais': 2}
+    count, path = df.attrs['rejected_report']
+    report = _report(path)
+    assert count == 4
+    assert sorted(zip(report['linha'], report['coluna'], report['valor'])) == [
+        (1, 'base_reais', 'abc'), (1, 'liquido_reais', 'abc'),
+        (4, 'base_reais', 'x,y'), (4, 'liquido_reais', 'x,y')]
+
+
+def test_rejected_cells_report_spans_chunks(bad_csv, tmp_path):
+    chunks = list(DataLoader_db.load_db_chunks(bad_csv, chunk_size=2, prefetch=0))
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    [path] = (tmp_path / 'rejeitadas').iterdir()
+    report = _report(path)
+    assert sorted(set(report['linha'])) == [1, 4]
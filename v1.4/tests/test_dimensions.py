@@ -0,0 +1,44 @@
+import openpyxl
+import pandas as pd
+
+from backend.dataloader_db import DataLoader_db
+from conftest import HEADER, sale
+
+
+def _numeric_xlsx(path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(HEADER)
+    for row in [sale(bem='AUTO'), sale(bem='5001'), sale(bem='5001', nome='CLIENTE B')]:
+        row[3] = int(row[3]) if row[3].isdigit() else row[3]  # BEM numérico na célula
+        row[7] = int(row[7])  # CONSORCIADO numérico
+        ws.append(row)
+    wb.save(path)
+    return str(path)
+
+
+def test_resolve_keys_numeric_natural_keys(warehouse):
+    from data.dimensions import _key_tuples, resolve_keys
+    records = pd.DataFrame({'bem': pd.Categorical([5001, 5001.0, 'AUTO', None])})
+    with warehouse.Session() as sess:
+        first = resolve_keys(sess, warehouse.dim_bem, ['bem'], _key_tuples(records, ['bem']))
+        sess.commit()
+    # Outra sessão: as chaves vêm de _lookup (texto), não do cache da sessão
+    with warehouse.Session() as sess:
+        again = resolve_keys(sess, warehouse.dim_bem, ['bem'], _key_tuples(records, ['bem']))
+        bens = dict(sess.execute(warehouse.dim_bem.select()).all())
+    assert list(first) == list(again)
+    assert first[0] == first[1] and first[3] is None
+    assert bens[first[0]] == '5001'
+
+
+def test_xlsx_with_numeric_bem(warehouse, tmp_path):
+    from data.db import insert_upload_and_vendas, query_vendas
+    df = DataLoader_db.load_db(_numeric_xlsx(tmp_path / 'vendas.xlsx'))
+    batch_id = insert_upload_and_vendas(df, 'vendas.xlsx')
+    # Segundo lote: as chaves já existem e são lidas do banco
+    insert_upload_and_vendas(DataLoader_db.load_db(str(tmp_path / 'vendas.xlsx')), 'vendas.xlsx')
+
+    stored = query_vendas(batch_ids=batch_id)
+    assert sorted(stored['bem']) == ['5001', '5001', 'AUTO']
+    assert set(stored['consorciado']) == {'1'}
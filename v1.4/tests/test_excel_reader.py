@@ -0,0 +1,24 @@
+import openpyxl
+import pandas as pd
+
+from backend.dataloader_db import DataLoader_db
+from backend.excel_reader import read_excel_fast
+from conftest import HEADER, sale, write_csv
+
+
+def test_xlsx_categories_are_text_like_csv(tmp_path):
+    rows = [sale(bem='5001', status='C'), sale(bem='AUTO'), sale(bem='5001.0')]
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(HEADER)
+    for row, bem in zip(rows, [5001, 'AUTO', 5001.0]):
+        ws.append([bem if h == 'BEM' else v for h, v in zip(HEADER, row)])
+    wb.save(tmp_path / 'vendas.xlsx')
+    rows[2][HEADER.index('BEM')] = '5001'
+
+    dtypes = DataLoader_db.SCHEMA.read_dtypes()
+    xlsx = read_excel_fast(str(tmp_path / 'vendas.xlsx'), dtype=dtypes)
+    csv = pd.read_csv(write_csv(tmp_path / 'vendas.csv', rows), sep=';', dtype=dtypes)
+    assert isinstance(xlsx['BEM'].dtype, pd.CategoricalDtype)
+    assert list(xlsx['BEM']) == list(csv['BEM']) == ['5001', 'AUTO', '5001']
+    assert all(isinstance(c, str) for c in xlsx['BEM'].cat.categories)
@@ -0,0 +1,69 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from backend import validation
+from data.filecache import HAS_PYARROW, FileCache
+
+
+def _write(path, size, mtime):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    os.utime(path, (mtime, mtime))
+
+
+def test_limit_covers_pdf_pages(tmp_path):
+    now = time.time()
+    _write(str(tmp_path / 'pdf_pages' / 'abc-v1' / '0.json'), 100, now - 30)
+    _write(str(tmp_path / 'frame.parquet'), 100, now - 10)
+    _write(str(tmp_path / 'consultas' / 'q.pkl'), 100, now - 40)  # limite próprio
+
+    cache = FileCache(cache_dir=str(tmp_path), max_bytes=150)
+    assert cache.size() == 200
+    cache.evict()
+    assert cache.size() == 100
+    assert os.path.exists(tmp_path / 'frame.parquet')
+    assert not os.path.exists(tmp_path / 'pdf_pages')  # diretório vazio removido
+
+    assert cache.clear() == 1
+    assert os.path.exists(tmp_path / 'consultas' / 'q.pkl')
+
+
+@pytest.mark.skipif(not HAS_PYARROW, reason="pyarrow não instalado")
+def test_attrs_survive_a_cache_hit(tmp_path):
+    cache = FileCache(cache_dir=str(tmp_path / 'cache'))
+    cache.enabled = True
+    source = tmp_path / 'vendas.csv'
+    source.write_text('a\n1\n')
+
+    calls = []
+
+    def loader(path):
+        calls.append(path)
+        df = pd.DataFrame({'a': [1]})
+        df.attrs['rejected_report'] = (2, '/tmp/vendas.rejeitadas.csv')
+        df.attrs['rejected_numeric'] = {'liquido_reais': 2}
+        return df
+
+    cache.load(str(source), loader, '1')
+    hit = cache.load(str(source), loader, '1')
+    assert len(calls) == 1
+    count, path = hit.attrs['rejected_report']
+    assert (count, path) == (2, '/tmp/vendas.rejeitadas.csv')
+    assert hit.attrs['rejected_numeric'] == {'liquido_reais': 2}
+
+    assert cache.clear() == 1
+    assert os.listdir(tmp_path / 'cache') == []
+
+
+def test_rejected_reports_keep_the_newest(tmp_path, monkeypatch):
+    monkeypatch.setattr(validation, 'REJECTED_KEEP', 2)
+    now = time.time()
+    for i in range(3):
+        _write(str(tmp_path / f'antigo{i}.rejeitadas.csv'), 10, now - 100 + i)
+    rejected = pd.DataFrame({'vendedor': ['TOTAL'], 'motivo': ['linha de totalização']})
+    path = validation.write_rejected_csv(rejected, 'vendas.csv', str(tmp_path), 'abc')
+    assert sorted(os.listdir(tmp_path)) == ['antigo2.rejeitadas.csv', os.path.basename(path)]
@@ -0,0 +1,54 @@
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from data import migrations
+from data.db import FATO_INDEXES
+
+
+class _FakeConn:
+    dialect = postgresql.dialect()
+
+    def __init__(self):
+        self.sql = []
+
+    def exec_driver_sql(self, sql):
+        self.sql.append(sql)
+
+
+def test_create_index_does_not_mark_shared_index(monkeypatch):
+    monkeypatch.setattr(migrations, '_invalid_index', lambda conn, name: False)
+    monkeypatch.setattr(migrations, 'is_partitioned', lambda conn, name: False)
+    conn = _FakeConn()
+    index = FATO_INDEXES[0]
+    migrations.create_index(conn, index)
+
+    assert conn.sql == [f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {index.name} '
+                        f'ON vendas_fato (data_venda)']
+    # create_all / CreateIndex em transação continuam sem CONCURRENTLY
+    assert 'CONCURRENTLY' not in str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+
+def test_legacy_vendas_table_is_migrated(tmp_path):
+    from sqlalchemy import inspect, select
+    from data import db
+    engine = db.configure_engine(f"sqlite:///{tmp_path / 'legado.db'}")
+    # Esquema anterior: vendas é uma tabela larga, sem dimensões
+    db.vendas.create(engine)
+    db.uploads.create(engine)
+    with engine.begin() as conn:
+        conn.execute(db.uploads.insert().values(id='lote', origem_arquivo='a.csv',
+                                                num_registros=1))
+        conn.execute(db.vendas.insert().values(batch_id='lote', vendedor='ANA', bem='AUTO',
+                                               nome_consorciado='CLIENTE A',
+                                               liquido_reais=10))
+    db.init_db()
+
+    insp = inspect(engine)
+    assert 'vendas' in insp.get_view_names()
+    assert {i['name'] for i in insp.get_indexes('vendas_fato')} >= \
+        {i.name for i in db.FATO_INDEXES}
+    with engine.connect() as conn:
+        row = conn.execute(select(db.vendas.c.vendedor, db.vendas.c.nome_consorciado,
+                                  db.vendas.c.liquido_reais)).one()
+    assert tuple(row) == ('ANA', 'CLIENTE A', 10)
+    db.dispose_engine()
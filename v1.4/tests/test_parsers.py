@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from backend.parsers import parse_br_numeric
+
+
+def _parse(values):
+    parsed, rejected = parse_br_numeric(pd.Series(values, dtype=object))
+    return parsed.tolist(), rejected.tolist()
+
+
+def test_br_numbers():
+    parsed, rejected = _parse(['1.234,56', 'R$ -12,00', '(12,00)', '12,00-', '1234.56'])
+    assert parsed == [1234.56, -12.0, -12.0, -12.0, 1234.56]
+    assert rejected == []
+
+
+def test_percentages():
+    # coluna 'COMISSAO %' / comissao_percentual
+    parsed, rejected = _parse(['5,00%', '10%', ' 2,5 % ', '-1,5%'])
+    assert parsed == [5.0, 10.0, 2.5, -1.5]
+    assert rejected == []
+
+
+def test_blank_and_invalid():
+    parsed, rejected = _parse(['', '-', None, 'abc'])
+    assert all(np.isnan(v) for v in parsed)
+    assert rejected == ['abc']
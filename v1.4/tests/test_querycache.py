@@ -0,0 +1,67 @@
+import pandas as pd
+from sqlalchemy import func, select
+
+from backend.dataloader_db import DataLoader_db
+from conftest import sale, write_csv
+from data.querycache import QueryCache
+
+
+def _insert(db, tmp_path, rows):
+    df = DataLoader_db.load_db(write_csv(tmp_path / 'vendas.csv', rows))
+    return db.insert_upload_and_vendas(df, 'vendas.csv')
+
+
+def _counting(cache):
+    calls = []
+
+    @cache.cached
+    def total_vendas(df, batch_ids=None):
+        calls.append(batch_ids)
+        from data.db import Session, vendas_fato
+        with Session() as sess:
+            return sess.execute(select(func.count()).select_from(vendas_fato)).scalar()
+    return total_vendas, calls
+
+
+def _cache(tmp_path, disk=False):
+    cache = QueryCache(disk=disk, cache_dir=str(tmp_path / 'consultas'))
+    cache.enabled = True
+    return cache
+
+
+def test_insert_invalidates(warehouse, tmp_path):
+    cache = _cache(tmp_path)
+    total_vendas, calls = _counting(cache)
+    _insert(warehouse, tmp_path, [sale()])
+
+    assert total_vendas(pd.DataFrame()) == 1
+    assert total_vendas(pd.DataFrame()) == 1
+    assert len(calls) == 1 and cache.hits == 1
+
+    _insert(warehouse, tmp_path, [sale(), sale(nome='CLIENTE B')])
+    assert total_vendas(pd.DataFrame()) == 3
+    assert len(calls) == 2
+
+
+def test_key_includes_database(tmp_path):
+    from data import db
+    cache = _cache(tmp_path, disk=True)
+    total_vendas, calls = _counting(cache)
+    results = []
+    # Dois armazéns com a mesma versão (um lote cada) e o mesmo cache em disco
+    for name, rows in [('a', [sale()]), ('b', [sale(), sale(nome='CLIENTE B')])]:
+        (tmp_path / name).mkdir()
+        db.configure_engine(f"sqlite:///{tmp_path / name / 'dw.db'}")
+        db.init_db()
+        _insert(db, tmp_path / name, rows)
+        results.append(total_vendas(pd.DataFrame()))
+    db.dispose_engine()
+    assert results == [1, 2]
+    assert len(calls) == 2
+
+
+def test_configure_engine_clears_memory(warehouse, tmp_path):
+    from data.querycache import query_cache
+    query_cache._remember('chave', 1)
+    warehouse.configure_engine(f"sqlite:///{tmp_path / 'outro.db'}")
+    assert query_cache.stats()['entries'] == 0
@@ -0,0 +1,61 @@
+import pandas as pd
+
+from backend.dataloader_db import DataLoader_db
+from backend.local_filters import (analytics_snapshot_local, relatorio_por_consorciado_local,
+                                   total_liquido_por_consorcio_vendedor_local,
+                                   total_liquido_por_vendedor_local)
+from conftest import sale, write_csv
+
+
+def _local_frame():
+    return pd.DataFrame({
+        'DATA VENDA': pd.to_datetime(['2025-03-01', '2025-03-02', '2025-03-03', '2025-03-04']),
+        'NOME CONSORCIADO': ['CLIENTE A', 'CLIENTE B', 'CLIENTE A', 'CLIENTE B'],
+        'VENDEDOR': ['ANA', 'BIA', 'BIA', 'ANA'],
+        'LÍQUIDO R$': [100.0, 50.0, 25.0, 10.0],
+    })
+
+
+def test_local_snapshot_matches_functions():
+    df = _local_frame()
+    snapshot = analytics_snapshot_local(df)
+    pd.testing.assert_frame_equal(snapshot['por_vendedor'].reset_index(drop=True),
+                                  total_liquido_por_vendedor_local(df).reset_index(drop=True))
+    pd.testing.assert_frame_equal(snapshot['por_consorcio_vendedor'],
+                                  total_liquido_por_consorcio_vendedor_local(df))
+    relatorio = relatorio_por_consorciado_local(df)
+    assert {k: (v['data_venda'], v['total']) for k, v in snapshot['relatorio'].items()} == \
+        {k: (v['data_venda'], v['total']) for k, v in relatorio.items()}
+
+
+def test_local_snapshot_without_nome_consorciado():
+    df = _local_frame().drop(columns='NOME CONSORCIADO')
+    snapshot = analytics_snapshot_local(df)
+    assert list(snapshot) == ['por_vendedor']
+    pd.testing.assert_frame_equal(snapshot['por_vendedor'].reset_index(drop=True),
+                                  total_liquido_por_vendedor_local(df).reset_index(drop=True))
+
+
+def test_db_snapshot_matches_functions(warehouse, tmp_path):
+    from backend.db_filters import (analytics_snapshot_db, relatorio_por_consorciado_db,
+                                    total_liquido_por_consorcio_vendedor_db,
+                                    total_liquido_por_vendedor_db)
+    rows = [sale(data_venda='01/03/2025', nome='CLIENTE A', liquido='100,00', vendedor='ANA'),
+            sale(data_venda='02/03/2025', nome='CLIENTE B', liquido='50,00', vendedor='BIA'),
+            sale(data_venda='03/03/2025', nome='CLIENTE A', liquido='25,00', vendedor='BIA'),
+            sale(data_venda='04/03/2025', nome='', consorciado='', liquido='7,00', vendedor='ANA')]
+    df = DataLoader_db.load_db(write_csv(tmp_path / 'vendas.csv', rows))
+    batch_id = warehouse.insert_upload_and_vendas(df, 'vendas.csv')
+
+    for batch_ids in (batch_id, None):
+        snapshot = analytics_snapshot_db(pd.DataFrame(), batch_ids)
+        por_vendedor = total_liquido_por_vendedor_db(pd.DataFrame(), batch_ids)
+        assert snapshot['por_vendedor'].astype(str).values.tolist() == \
+            por_vendedor.astype(str).values.tolist()
+        por_consorcio = total_liquido_por_consorcio_vendedor_db(pd.DataFrame(), batch_ids)
+        assert sorted(map(tuple, snapshot['por_consorcio_vendedor'].astype(str).values)) == \
+            sorted(map(tuple, por_consorcio.astype(str).values))
+        relatorio = relatorio_por_consorciado_db(pd.DataFrame(), batch_ids)
+        assert {k: (v['data_venda'], float(v['total'])) for k, v in snapshot['relatorio'].items()} \
+            == {k: (v['data_venda'], float(v['total'])) for k, v in relatorio.items()}
+        assert float(snapshot['relatorio']['CLIENTE A']['total']) == 150.0
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import delete, func, select
+
+from backend.dataloader_db import DataLoader_db
+from conftest import sale, write_csv
+
+
+@pytest.fixture
+def chunks(tmp_path):
+    rows = [sale(nome=f'CLIENTE {i}', liquido=f'{i},00') for i in range(1, 10)]
+    df = DataLoader_db.load_db(write_csv(tmp_path / 'vendas.csv', rows))
+    return [df.iloc[i:i + 3] for i in range(0, 9, 3)]
+
+
+def _failing(chunks, after):
+    for i, chunk in enumerate(chunks):
+        if i == after:
+            raise ConnectionError("conexão caiu")
+        yield chunk
+
+
+def _batch(warehouse, batch_id):
+    with warehouse.Session() as sess:
+        rows = sess.execute(select(func.count(), func.sum(warehouse.vendas_fato.c.liquido_reais))
+                            .where(warehouse.vendas_fato.c.batch_id == batch_id)).one()
+        registros = sess.execute(select(warehouse.uploads.c.num_registros)
+                                 .where(warehouse.uploads.c.id == batch_id)).scalar()
+    return rows[0], float(rows[1]), registros
+
+
+def test_resume_after_partial_staging(warehouse, chunks):
+    from data.staging import insert_upload_and_vendas_resumable, upload_checkpoints
+    with pytest.raises(ConnectionError):
+        insert_upload_and_vendas_resumable(_failing(chunks, 2), 'vendas.csv', 'k', 3)
+    with warehouse.Session() as sess:
+        done = sess.execute(select(upload_checkpoints.c.chunks_done)).scalar()
+    assert done == 2
+
+    batch_id = insert_upload_and_vendas_resumable(chunks, 'vendas.csv', 'k', 3)
+    assert _batch(warehouse, batch_id) == (9, 45.0, 9)
+
+
+def test_resume_restarts_when_staging_was_lost(warehouse, chunks):
+    from data.staging import insert_upload_and_vendas_resumable, vendas_staging
+    with pytest.raises(ConnectionError):
+        insert_upload_and_vendas_resumable(_failing(chunks, 2), 'vendas.csv', 'k', 3)
+    # Queda do PostgreSQL: a tabela UNLOGGED volta vazia, o checkpoint não
+    with warehouse.Session() as sess:
+        sess.execute(delete(vendas_staging))
+        sess.commit()
+
+    batch_id = insert_upload_and_vendas_resumable(chunks, 'vendas.csv', 'k', 3)
+    assert _batch(warehouse, batch_id) == (9, 45.0, 9)
@@ -0,0 +1,24 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from data.db import query_vendas_stmt, vendas
+from data.streaming import _copy_query
+
+
+def test_copy_query_expands_in_list_for_postgresql():
+    stmt = select(vendas.c.id).where(vendas.c.batch_id.in_(['a', 'b']))
+    sql, params = _copy_query(stmt, postgresql.dialect())
+    assert 'POSTCOMPILE' not in sql
+    assert sorted(v for v in params.values() if isinstance(v, str)) == ['a', 'b']
+    # pyformat do psycopg2: um %(nome)s por valor da lista
+    for name in params:
+        assert f'%({name})s' in sql
+
+
+def test_query_vendas_stmt_compiles_for_copy_on_postgresql():
+    stmt = query_vendas_stmt(batch_ids=['b1', 'b2'], origem_arquivo=['x.csv'],
+                             columns=['batch_id', 'liquido_reais'])
+    sql, params = _copy_query(stmt, postgresql.dialect())
+    assert 'POSTCOMPILE' not in sql
+    assert {'b1', 'b2', 'x.csv'} <= set(params.values())
+    assert sql.count('%(') == len(params)
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+
+
+def _uploads(warehouse, names):
+    base = datetime(2025, 3, 1)
+    with warehouse.Session() as sess:
+        sess.execute(warehouse.uploads.insert(), [
+            # Pares com a mesma data_upload: o id desempata o cursor
+            {'id': f"lote-{i:02d}", 'origem_arquivo': name, 'num_registros': i,
+             'data_upload': base + timedelta(hours=i // 2)}
+            for i, name in enumerate(names)
+        ])
+        sess.commit()
+
+
+def test_keyset_pages_cover_every_upload_once(warehouse):
+    from data.db import list_uploads
+    _uploads(warehouse, [f"arquivo_{i}.csv" for i in range(7)])
+    seen, after = [], None
+    while True:
+        page = list_uploads(after=after, limit=2)
+        if not page:
+            break
+        seen += [row[0] for row in page]
+        after = (page[-1][2], page[-1][0])
+    assert seen == [f"lote-{i:02d}" for i in reversed(range(7))]
+
+
+def test_prefix_search_is_case_insensitive_and_literal(warehouse):
+    from data.db import list_uploads
+    _uploads(warehouse, ['Vendas_Marco.csv', 'vendasXmarco.csv', 'vendas_abril.xlsx',
+                         '100%_comissao.csv', '100x_comissao.csv'])
+    assert sorted(r[1] for r in list_uploads(prefix='VENDAS_')) == \
+        ['Vendas_Marco.csv', 'vendas_abril.xlsx']
+    assert [r[1] for r in list_uploads(prefix='100%')] == ['100%_comissao.csv']
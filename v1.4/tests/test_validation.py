@@ -0,0 +1,26 @@
+import os
+
+import pandas as pd
+
+from backend.validation import write_rejected_csv
+from data.db import _clean_vendas
+
+
+def _chunk(vendedores):
+    return pd.DataFrame({'vendedor': vendedores, 'valor': range(len(vendedores))})
+
+
+def test_rejected_line_counts_previous_chunks():
+    # Cada bloco chega com o índice começando em 0
+    _, first = _clean_vendas(_chunk(['ANA', 'TOTAL', 'BIA']), 0)
+    _, second = _clean_vendas(_chunk(['ANA', 'BIA', 'TOTAL GERAL']), 3)
+    assert first.index.tolist() == [1]
+    assert second.index.tolist() == [5]
+
+
+def test_rejected_report_name_is_keyed(tmp_path):
+    rejected = _chunk(['TOTAL']).assign(motivo='linha de totalização')
+    a = write_rejected_csv(rejected, '/a/vendas.csv', str(tmp_path), 'aaaaaaaaaaaaaaaa')
+    b = write_rejected_csv(rejected, '/b/vendas.csv', str(tmp_path), 'bbbbbbbbbbbbbbbb')
+    assert a != b
+    assert os.path.exists(a) and os.path.exists(b)